@@ -5,7 +5,10 @@ from fastapi import APIRouter, Depends, Query
 from fastapi.responses import RedirectResponse
 from google_auth_oauthlib.flow import Flow
 
+from api.calendar import invalidate_calendar_caches
+from api.calendar_sync import forget_user as forget_synced_calendar
 from api.deps import get_current_user_id, get_supabase, decode_access_token
+from api.tokens import token_manager
 from config import settings
 
 router = APIRouter()
@@ -84,6 +87,8 @@ async def google_calendar_callback(
             },
             on_conflict="user_id",
         ).execute()
+        token_manager.forget(user_id)
+        invalidate_calendar_caches(user_id)
         return RedirectResponse(url=f"{settings.app_url}?calendar_connected=1")
     except Exception:
         logger.exception("Google OAuth callback failed")
@@ -96,10 +101,17 @@ def google_calendar_disconnect(
     supabase=Depends(get_supabase),
 ):
     """Remove stored Google Calendar tokens for the user."""
+    token_manager.forget(user_id)
     supabase.table("calendar_tokens").delete().eq("user_id", user_id).execute()
+    invalidate_calendar_caches(user_id)
     try:
-        supabase.table("calendar_week_cache").delete().eq("user_id", user_id).execute()
+        supabase.table("calendar_day_cache").delete().eq("user_id", user_id).execute()
     except Exception:
         # Cache table may not exist; ignore so disconnect still succeeds
         pass
+    try:
+        forget_synced_calendar(supabase, user_id)
+    except Exception:
+        # Event store tables may not exist yet (migration 009)
+        pass
     return {"ok": True, "disconnected": True}
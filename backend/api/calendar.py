@@ -1,38 +1,197 @@
 """Google Calendar free-busy and add event."""
+import asyncio
+import hashlib
+import itertools
+import json
+import logging
+import threading
+import time
 from datetime import datetime, timedelta, timezone
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+from fastapi import APIRouter, Depends, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
-import httpx
+from googleapiclient.discovery import build_from_document
+import google_auth_httplib2
+import httplib2
 
+from api import calendar_sync as sync_store
+from api.cache import TTLCache
 from api.deps import get_current_user_id, get_supabase
+from api.etag import etag, not_modified
+from api.gcal_async import calendar_client
+from api.intervals import AvailabilityIndex, free_blocks, from_epoch, to_epoch
+from api.tokens import TOKEN_URI, token_manager
 from api.time_utils import clamp_range, parse_iso
 from config import settings
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 CACHE_TTL_SECONDS = 1800
+FREEBUSY_MAX_DAYS = 45
+DAY = timedelta(days=1)
+# Google caps a Calendar batch request at 50 calls
+BATCH_LIMIT = 50
 
+# Built services keyed by (user_id, credential generation)
+_service_cache = TTLCache(
+    maxsize=settings.calendar_service_cache_size,
+    ttl=settings.calendar_service_cache_ttl_seconds,
+)
+# calendarList items per user: {"items", "etag", "paged", "checked_at"}
+_calendar_list_cache = TTLCache(maxsize=settings.calendar_list_cache_size, ttl=86400)
+# {"events", "busy"} per (user_id, UTC day); L1 for calendar_day_cache
+_day_cache = TTLCache(maxsize=settings.day_cache_size, ttl=settings.day_cache_ttl_seconds)
+# In-flight background refreshes, one per (user_id, first day, end day)
+_day_refreshes: dict[tuple, asyncio.Task] = {}
+# Generation of the last invalidation per (user_id, day), or (user_id, None)
+# for all of a user's days; reads started before it must not be cached
+_day_generation = itertools.count(1)
+_day_invalidations = TTLCache(maxsize=settings.day_cache_size, ttl=CACHE_TTL_SECONDS)
+_discovery_doc: Optional[dict] = None
+_discovery_lock = threading.Lock()
 
-def _calendar_items(service, min_access_role: str) -> list[dict]:
-    items: list[dict] = []
-    page_token = None
-    while True:
-        resp = service.calendarList().list(
-            minAccessRole=min_access_role,
-            showHidden=True,
-            pageToken=page_token,
-        ).execute()
-        items.extend(resp.get("items", []))
-        page_token = resp.get("nextPageToken")
-        if not page_token:
-            break
-    return items
+
+def _calendar_discovery() -> dict:
+    """Parse the Calendar v3 discovery document bundled with googleapiclient once."""
+    global _discovery_doc
+    if _discovery_doc is None:
+        with _discovery_lock:
+            if _discovery_doc is None:
+                from googleapiclient.discovery_cache import get_static_doc
+
+                raw = get_static_doc("calendar", "v3")
+                if not raw:
+                    raise RuntimeError("Bundled Calendar v3 discovery document not found")
+                _discovery_doc = json.loads(raw)
+    return _discovery_doc
+
+
+class _ThreadLocalHttp:
+    """Authorized httplib2 transport, one connection set per thread.
+
+    httplib2.Http is not thread-safe, while a cached service object is shared
+    by every worker thread serving the same user.
+    """
+
+    def __init__(self, credentials: Credentials):
+        self.credentials = credentials
+        self._local = threading.local()
+
+    def _http(self):
+        http = getattr(self._local, "http", None)
+        if http is None:
+            http = google_auth_httplib2.AuthorizedHttp(self.credentials, http=httplib2.Http())
+            self._local.http = http
+        return http
+
+    def request(self, *args, **kwargs):
+        return self._http().request(*args, **kwargs)
+
+
+def _credential_generation(creds: Credentials) -> str:
+    return hashlib.sha256((creds.token or "").encode()).hexdigest()[:16]
+
+
+def _service_for(user_id: str, creds: Credentials):
+    key = (user_id, _credential_generation(creds))
+    service = _service_cache.get(key)
+    if service is None:
+        # A new generation supersedes older services for this user
+        _service_cache.discard_where(lambda k: k[0] == user_id)
+        service = build_from_document(_calendar_discovery(), http=_ThreadLocalHttp(creds))
+        _service_cache.set(key, service)
+    return service
+
+
+def invalidate_calendar_caches(user_id: str) -> None:
+    """Forget a user's built services and calendar list (connect/disconnect)."""
+    _service_cache.discard_where(lambda k: k[0] == user_id)
+    _calendar_list_cache.pop(user_id)
+    _invalidate_days(user_id, None)
+
+
+def _invalidate_days(user_id: str, days: Optional[set[datetime]]) -> None:
+    """Drop L1 day shards (all of the user's when ``days`` is None) and fence off older reads."""
+    generation = next(_day_generation)
+    if days is None:
+        _day_invalidations.set((user_id, None), generation)
+        _day_cache.discard_where(lambda k: k[0] == user_id)
+        return
+    for day in days:
+        _day_invalidations.set((user_id, day), generation)
+        _day_cache.pop((user_id, day))
+
+
+def _invalidated_since(user_id: str, day: datetime, generation: int) -> bool:
+    """Whether ``day`` was invalidated after a read that started at ``generation``."""
+    return max(
+        _day_invalidations.get((user_id, None), 0),
+        _day_invalidations.get((user_id, day), 0),
+    ) > generation
 
 
-def _calendar_ids_for_events(service) -> list[str]:
+def _span_days(spans) -> Optional[set[datetime]]:
+    """UTC days touched by (start, end) ISO pairs; None when one can't be parsed."""
+    days: set[datetime] = set()
+    for start, end in spans:
+        try:
+            start_dt, end_dt = _aware(parse_iso(start)), _aware(parse_iso(end))
+        except Exception:
+            return None
+        # A zero-length event still belongs to the day containing it
+        days.update(_utc_days(start_dt.astimezone(timezone.utc), max(end_dt, start_dt + timedelta(microseconds=1))))
+    return days
+
+
+def calendar_changed(user_id: str, supabase, spans=None) -> None:
+    """Drop cached calendar reads after we wrote to the user's calendar.
+
+    ``spans`` are the (start, end) ISO strings of the written events; only
+    the UTC days they cover are dropped. Without them every day is.
+    """
+    days = _span_days(spans) if spans is not None else None
+    _invalidate_days(user_id, days)
+    _delete_day_rows(supabase, user_id, days)
+    sync_store.mark_stale(user_id)
+
+
+def service_cache_stats() -> dict:
+    return _service_cache.stats()
+
+
+def calendar_list_cache_stats() -> dict:
+    return _calendar_list_cache.stats()
+
+
+def day_cache_stats() -> dict:
+    return {**_day_cache.stats(), "refreshing": len(_day_refreshes)}
+
+
+async def _calendar_items(user_id: str, token: str) -> list[dict]:
+    """Return every calendar we can at least read free/busy from.
+
+    One calendarList walk with the widest role filter serves both the events
+    and the free/busy id sets. Results are cached per user; after
+    CALENDAR_LIST_TTL_SECONDS a single-page list is revalidated with its ETag.
+    """
+    cached = _calendar_list_cache.get(user_id)
+    now = time.monotonic()
+    if cached and now - cached["checked_at"] < settings.calendar_list_ttl_seconds:
+        return cached["items"]
+    etag = cached.get("etag") if cached and not cached.get("paged") else None
+    fresh = await calendar_client.calendar_list(user_id, token, etag=etag)
+    if fresh is None:
+        cached["checked_at"] = now
+        _calendar_list_cache.set(user_id, cached)
+        return cached["items"]
+    _calendar_list_cache.set(user_id, {**fresh, "checked_at": now})
+    return fresh["items"]
+
+
+def _calendar_ids_for_events(items: list[dict]) -> list[str]:
     """Return calendar ids we can list events from."""
-    items = _calendar_items(service, min_access_role="reader")
     ids: list[str] = []
     for cal in items:
         cid = cal.get("id")
@@ -48,9 +207,8 @@ def _calendar_ids_for_events(service) -> list[str]:
     return ids
 
 
-def _calendar_ids_for_busy(service) -> list[str]:
+def _calendar_ids_for_busy(items: list[dict]) -> list[str]:
     """Return calendar ids we can use for free/busy."""
-    items = _calendar_items(service, min_access_role="freeBusyReader")
     ids: list[str] = []
     for cal in items:
         cid = cal.get("id")
@@ -61,247 +219,495 @@ def _calendar_ids_for_busy(service) -> list[str]:
     return ids
 
 
-def _fetch_busy(service, start_dt: datetime, end_dt: datetime, cal_ids: list[str]) -> list[dict]:
-    body = {
-        "timeMin": start_dt.isoformat(),
-        "timeMax": end_dt.isoformat(),
-        "items": [{"id": cid} for cid in cal_ids],
+def _normalize_event(e: dict) -> dict:
+    start_obj = e.get("start", {})
+    end_obj = e.get("end", {})
+    if "dateTime" in start_obj:
+        start_val = start_obj.get("dateTime")
+        end_val = end_obj.get("dateTime")
+        all_day = False
+    else:
+        start_val = start_obj.get("date")
+        end_val = end_obj.get("date")
+        all_day = True
+    return {
+        "id": e.get("id"),
+        "summary": e.get("summary", "Busy"),
+        "start": start_val,
+        "end": end_val,
+        "all_day": all_day,
     }
-    result = service.freebusy().query(body=body).execute()
-    calendars = result.get("calendars", {})
-    busy: list[dict] = []
-    for cid in cal_ids:
-        busy.extend(calendars.get(cid, {}).get("busy", []))
+
+
+async def _access_token(user_id: str, supabase) -> str:
+    # Token store may hit Supabase or Google on a cold/expired token; keep it off the loop
+    record = await run_in_threadpool(token_manager.get, user_id, supabase)
+    return record.access_token
+
+
+def _execute_batch(service, requests: list) -> list[tuple[Optional[dict], Optional[Exception]]]:
+    """Run API requests through Google's batch endpoint, BATCH_LIMIT per round-trip.
+
+    Returns one (response, exception) pair per request, in request order.
+    """
+    results: list[tuple[Optional[dict], Optional[Exception]]] = [(None, None)] * len(requests)
+
+    def _collect(request_id, response, exception):
+        results[int(request_id)] = (response, exception)
+
+    for offset in range(0, len(requests), BATCH_LIMIT):
+        batch = service.new_batch_http_request(callback=_collect)
+        for i, request in enumerate(requests[offset:offset + BATCH_LIMIT], start=offset):
+            batch.add(request, request_id=str(i))
+        batch.execute()
+    return results
+
+
+def _list_events_batched(service, start_dt: datetime, end_dt: datetime, cal_ids: list[str]) -> list[list[dict]]:
+    """List events for every calendar in one batch round-trip; a failing calendar yields []."""
+
+    def _events_request(cid: str, page_token: Optional[str] = None):
+        return service.events().list(
+            calendarId=cid,
+            timeMin=start_dt.isoformat(),
+            timeMax=end_dt.isoformat(),
+            singleEvents=True,
+            orderBy="startTime",
+            maxResults=2500,
+            pageToken=page_token,
+        )
+
+    per_calendar: list[list[dict]] = []
+    results = _execute_batch(service, [_events_request(cid) for cid in cal_ids])
+    for cid, (result, exc) in zip(cal_ids, results):
+        if exc is not None or result is None:
+            per_calendar.append([])
+            continue
+        items = list(result.get("items", []))
+        page_token = result.get("nextPageToken")
+        while page_token:
+            try:
+                page = _events_request(cid, page_token).execute()
+            except Exception:
+                break
+            items.extend(page.get("items", []))
+            page_token = page.get("nextPageToken")
+        per_calendar.append(items)
+    return per_calendar
+
+
+def insert_events(service, events: list[dict], calendar_id: str = "primary") -> list[tuple[Optional[dict], Optional[Exception]]]:
+    """Insert several events with one batch request; returns (created, exception) per event."""
+    if len(events) == 1:
+        try:
+            return [(service.events().insert(calendarId=calendar_id, body=events[0]).execute(), None)]
+        except Exception as e:
+            return [(None, e)]
+    return _execute_batch(
+        service,
+        [service.events().insert(calendarId=calendar_id, body=event) for event in events],
+    )
+
+
+async def _list_events(user_id: str, token: str, start_dt: datetime, end_dt: datetime, cal_ids: list[str], supabase=None) -> list[dict]:
+    per_calendar = None
+    if settings.calendar_batch_requests and supabase is not None and len(cal_ids) > 1:
+        service = await run_in_threadpool(get_calendar_service, user_id, supabase)
+        try:
+            per_calendar = await run_in_threadpool(_list_events_batched, service, start_dt, end_dt, cal_ids)
+        except Exception:
+            # The batch round-trip itself failed; per-calendar requests tolerate single failures
+            logger.warning("Calendar batch request failed for %s; listing calendars separately", user_id, exc_info=True)
+    if per_calendar is None:
+        per_calendar = await calendar_client.list_events_many(user_id, token, cal_ids, start_dt, end_dt)
+    return [_normalize_event(e) for items in per_calendar for e in items]
+
+
+async def _fetch_busy(user_id: str, token: str, start_dt: datetime, end_dt: datetime, cal_ids: list[str]) -> list[dict]:
+    # freebusy rejects long ranges; query longer horizons in chunks
+    chunks = []
+    chunk_start = start_dt
+    while chunk_start < end_dt:
+        chunk_end = min(end_dt, chunk_start + timedelta(days=FREEBUSY_MAX_DAYS))
+        chunks.append((chunk_start, chunk_end))
+        chunk_start = chunk_end
+    results = await asyncio.gather(
+        *(calendar_client.freebusy(user_id, token, cs, ce, cal_ids) for cs, ce in chunks)
+    )
+    return [b for busy in results for b in busy]
+
+
+def _stored_event(row: dict) -> dict:
+    return {
+        "id": row["event_id"],
+        "summary": row.get("summary") or "Busy",
+        "start": row["start_value"],
+        "end": row["end_value"],
+        "all_day": row["all_day"],
+    }
+
+
+def _stored_busy(rows: list[dict], start_dt: datetime, end_dt: datetime) -> list[dict]:
+    """Busy intervals from stored events, clipped to the range like freebusy does."""
+    busy = []
+    for row in rows:
+        if not row["busy"]:
+            continue
+        b_start = max(parse_iso(row["start_at"]), start_dt)
+        b_end = min(parse_iso(row["end_at"]), end_dt)
+        if b_end > b_start:
+            busy.append({"start": b_start.isoformat(), "end": b_end.isoformat()})
     return busy
 
 
-def _list_events(service, start_dt: datetime, end_dt: datetime, cal_ids: list[str]) -> list[dict]:
-    events: list[dict] = []
-    for cid in cal_ids:
+async def _calendar_data(
+    user_id: str,
+    supabase,
+    start_dt: datetime,
+    end_dt: datetime,
+    want_events: bool = True,
+    want_busy: bool = True,
+) -> tuple[list[dict], list[dict]]:
+    """Return (events, busy) for the range, from the synced store when possible."""
+    token = await _access_token(user_id, supabase)
+    calendars = await _calendar_items(user_id, token)
+    event_ids = _calendar_ids_for_events(calendars)
+    busy_ids = _calendar_ids_for_busy(calendars)
+    synced = False
+    if settings.calendar_incremental_sync:
         try:
-            result = service.events().list(
-                calendarId=cid,
-                timeMin=start_dt.isoformat(),
-                timeMax=end_dt.isoformat(),
-                singleEvents=True,
-                orderBy="startTime",
-                maxResults=2500,
-            ).execute()
+            synced = await sync_store.ensure_synced(user_id, token, supabase, event_ids, start_dt)
         except Exception:
+            logger.warning("Calendar store unavailable; reading Google directly", exc_info=True)
+    if synced:
+        rows = await run_in_threadpool(sync_store.read_events, supabase, user_id, event_ids, start_dt, end_dt)
+        events = [_stored_event(r) for r in rows] if want_events else []
+        busy = _stored_busy(rows, start_dt, end_dt) if want_busy else []
+        # Free/busy-only calendars have no readable events; ask freebusy for those
+        busy_only = [cid for cid in busy_ids if cid not in event_ids]
+        if want_busy and busy_only:
+            busy += await _fetch_busy(user_id, token, start_dt, end_dt, busy_only)
+        return events, busy
+
+    async def _none() -> list:
+        return []
+
+    return tuple(
+        await asyncio.gather(
+            _list_events(user_id, token, start_dt, end_dt, event_ids, supabase) if want_events else _none(),
+            _fetch_busy(user_id, token, start_dt, end_dt, busy_ids) if want_busy else _none(),
+        )
+    )
+
+
+def _utc_days(start_dt: datetime, end_dt: datetime) -> list[datetime]:
+    """UTC midnights of every day overlapping [start_dt, end_dt)."""
+    day = datetime(start_dt.year, start_dt.month, start_dt.day, tzinfo=timezone.utc)
+    days = []
+    while day < end_dt:
+        days.append(day)
+        day += DAY
+    return days
+
+
+def _day_runs(days: list[datetime]) -> list[tuple[datetime, datetime]]:
+    """Group sorted days into contiguous [start, end) ranges."""
+    runs: list[list[datetime]] = []
+    for day in days:
+        if runs and runs[-1][1] == day:
+            runs[-1][1] = day + DAY
+        else:
+            runs.append([day, day + DAY])
+    return [(s, e) for s, e in runs]
+
+
+def _event_bounds(e: dict) -> Optional[tuple[datetime, datetime]]:
+    try:
+        if e.get("all_day"):
+            start = datetime.fromisoformat(e["start"]).replace(tzinfo=timezone.utc)
+            end = datetime.fromisoformat(e["end"]).replace(tzinfo=timezone.utc)
+        else:
+            start, end = parse_iso(e["start"]), parse_iso(e["end"])
+    except Exception:
+        return None
+    return start, end
+
+
+def _overlaps(start: datetime, end: datetime, range_start: datetime, range_end: datetime) -> bool:
+    # Zero-length events belong to the range containing their instant
+    return start < range_end and (end > range_start or start == end >= range_start)
+
+
+def _split_days(events: list[dict], busy: list[dict], days: list[datetime]) -> dict[datetime, dict]:
+    """Cut a fetched range into per-day {"events", "busy"} shards."""
+    shards = {day: {"events": [], "busy": []} for day in days}
+    for e in events:
+        bounds = _event_bounds(e)
+        if bounds is None:
             continue
-        items = result.get("items", [])
-        for e in items:
-            start_obj = e.get("start", {})
-            end_obj = e.get("end", {})
-            if "dateTime" in start_obj:
-                start_val = start_obj.get("dateTime")
-                end_val = end_obj.get("dateTime")
-                all_day = False
-            else:
-                start_val = start_obj.get("date")
-                end_val = end_obj.get("date")
-                all_day = True
-            events.append(
+        i = max(0, (bounds[0] - days[0]) // DAY)
+        while i < len(days) and _overlaps(bounds[0], bounds[1], days[i], days[i] + DAY):
+            shards[days[i]]["events"].append(e)
+            i += 1
+    index = AvailabilityIndex.from_busy(busy)
+    for day in days:
+        shards[day]["busy"] = [
+            {"start": from_epoch(s).isoformat(), "end": from_epoch(e).isoformat()}
+            for s, e in index.busy_between(to_epoch(day), to_epoch(day + DAY))
+        ]
+    return shards
+
+
+def _assemble(shards: list[dict], start_dt: datetime, end_dt: datetime) -> tuple[list[dict], list[dict]]:
+    """Join day shards back into (events, busy) for [start_dt, end_dt)."""
+    seen = set()
+    events = []
+    for shard in shards:
+        for e in shard["events"]:
+            key = (e.get("id"), e.get("start"), e.get("end"))
+            if key in seen:
+                continue
+            seen.add(key)
+            bounds = _event_bounds(e)
+            if bounds and _overlaps(bounds[0], bounds[1], start_dt, end_dt):
+                events.append((bounds[0], e))
+    events.sort(key=lambda pair: pair[0])
+    index = AvailabilityIndex.from_busy(b for shard in shards for b in shard["busy"])
+    busy = [
+        {"start": from_epoch(s).isoformat(), "end": from_epoch(e).isoformat()}
+        for s, e in index.busy_between(to_epoch(start_dt), to_epoch(end_dt))
+    ]
+    return [e for _, e in events], busy
+
+
+def _read_day_rows(supabase, user_id: str, first_day: datetime, last_day: datetime, now: datetime, max_age: float) -> dict[datetime, tuple[dict, float]]:
+    """Return {day: (shard, age in seconds)} for cached days at most ``max_age`` old."""
+    try:
+        r = (
+            supabase.table("calendar_day_cache")
+            .select("day,events,busy,fetched_at")
+            .eq("user_id", user_id)
+            .gte("day", first_day.date().isoformat())
+            .lte("day", last_day.date().isoformat())
+            .execute()
+        )
+    except Exception:
+        # Cache table may not exist yet (migration 010)
+        return {}
+    found = {}
+    for row in r.data or []:
+        fetched_at = parse_iso(row["fetched_at"])
+        if fetched_at.tzinfo is None:
+            fetched_at = fetched_at.replace(tzinfo=timezone.utc)
+        age = (now - fetched_at).total_seconds()
+        if age <= max_age:
+            day = datetime.fromisoformat(row["day"]).replace(tzinfo=timezone.utc)
+            shard = {"events": row.get("events") or [], "busy": row.get("busy") or [], "fetched_at": row["fetched_at"]}
+            found[day] = (shard, age)
+    return found
+
+
+def _delete_day_rows(supabase, user_id: str, days: Optional[set[datetime]]) -> None:
+    """Delete the user's calendar_day_cache rows for ``days`` (all when None)."""
+    if days is not None and not days:
+        return
+    try:
+        q = supabase.table("calendar_day_cache").delete().eq("user_id", user_id)
+        if days is not None:
+            q = q.in_("day", sorted(day.date().isoformat() for day in days))
+        q.execute()
+    except Exception:
+        pass
+
+
+def _write_day_rows(supabase, user_id: str, shards: dict[datetime, dict], now: datetime) -> None:
+    try:
+        supabase.table("calendar_day_cache").upsert(
+            [
                 {
-                    "id": e.get("id"),
-                    "summary": e.get("summary", "Busy"),
-                    "start": start_val,
-                    "end": end_val,
-                    "all_day": all_day,
+                    "user_id": user_id,
+                    "day": day.date().isoformat(),
+                    "events": shard["events"],
+                    "busy": shard["busy"],
+                    "fetched_at": now.isoformat(),
                 }
-            )
-    return events
+                for day, shard in shards.items()
+            ],
+            on_conflict="user_id,day",
+        ).execute()
+    except Exception:
+        pass
+
+
+async def _fetch_days(user_id: str, supabase, run_start: datetime, run_end: datetime) -> dict[datetime, dict]:
+    """Read [run_start, run_end) from Google and cache it per day.
+
+    Days invalidated while the read was in flight are returned but not
+    cached, so an older read never overwrites a newer invalidation.
+    """
+    generation = next(_day_generation)
+    events, busy = await _calendar_data(user_id, supabase, run_start, run_end)
+    shards = _split_days(events, busy, _utc_days(run_start, run_end))
+    now = datetime.now(timezone.utc)
+    for shard in shards.values():
+        shard["fetched_at"] = now.isoformat()
+    fresh = {day: shard for day, shard in shards.items() if not _invalidated_since(user_id, day, generation)}
+    if fresh:
+        await run_in_threadpool(_write_day_rows, supabase, user_id, fresh, now)
+    late = {day for day in fresh if _invalidated_since(user_id, day, generation)}
+    if late:
+        # Invalidated while the rows were being written: take them back out
+        await run_in_threadpool(_delete_day_rows, supabase, user_id, late)
+    for day, shard in fresh.items():
+        if day not in late:
+            _day_cache.set((user_id, day), shard)
+    return shards
 
 
-def _free_from_busy(busy: list[dict], start_dt: datetime, end_dt: datetime) -> list[dict]:
-    intervals = []
-    for b in busy:
+def _refresh_days_in_background(user_id: str, supabase, run_start: datetime, run_end: datetime) -> None:
+    key = (user_id, run_start, run_end)
+    if key in _day_refreshes:
+        return
+
+    async def refresh():
         try:
-            b_start = parse_iso(b["start"])
-            b_end = parse_iso(b["end"])
+            await _fetch_days(user_id, supabase, run_start, run_end)
         except Exception:
-            continue
-        if b_end <= start_dt or b_start >= end_dt:
-            continue
-        if b_start < start_dt:
-            b_start = start_dt
-        if b_end > end_dt:
-            b_end = end_dt
-        if b_end > b_start:
-            intervals.append((b_start, b_end))
-    if not intervals:
-        return [{"start": start_dt.isoformat(), "end": end_dt.isoformat()}]
-    intervals.sort(key=lambda x: x[0])
-    merged = [intervals[0]]
-    for s, e in intervals[1:]:
-        last_s, last_e = merged[-1]
-        if s <= last_e:
-            if e > last_e:
-                merged[-1] = (last_s, e)
-        else:
-            merged.append((s, e))
-    free = []
-    cursor = start_dt
-    for s, e in merged:
-        if s > cursor:
-            free.append({"start": cursor.isoformat(), "end": s.isoformat()})
-        if e > cursor:
-            cursor = e
-    if cursor < end_dt:
-        free.append({"start": cursor.isoformat(), "end": end_dt.isoformat()})
-    return free
-
-
-def get_busy(user_id: str, supabase, start: str, end: str) -> list:
+            logger.warning("Background calendar refresh failed for %s", user_id, exc_info=True)
+        finally:
+            _day_refreshes.pop(key, None)
+
+    _day_refreshes[key] = asyncio.create_task(refresh())
+
+
+def _aware(dt: datetime) -> datetime:
+    return dt if dt.tzinfo is not None else dt.replace(tzinfo=timezone.utc)
+
+
+async def _range_shards(user_id: str, supabase, start_dt: datetime, end_dt: datetime, allow_stale: bool = False) -> tuple[list[dict], bool]:
+    """Return (day shards, stale) covering the range, from cache where possible.
+
+    Only days missing from both cache levels are fetched from Google, one
+    request set per contiguous run. With ``allow_stale`` (display only), days
+    older than CACHE_TTL_SECONDS are still served (``stale`` is True) while a
+    background task refreshes them; otherwise they are refetched first, so
+    scheduling never works from old busy time. Each shard carries the
+    ``fetched_at`` of its Google read.
+    """
+    start_dt, end_dt = _aware(start_dt), _aware(end_dt)
+    days = _utc_days(start_dt.astimezone(timezone.utc), end_dt)
+    shards = {}
+    for day in days:
+        shard = _day_cache.get((user_id, day))
+        if shard is not None:
+            shards[day] = shard
+    missing = [day for day in days if day not in shards]
+    stale_days = []
+    if missing:
+        swr = allow_stale and settings.calendar_stale_while_revalidate
+        max_age = max(CACHE_TTL_SECONDS, settings.day_cache_max_stale_seconds) if swr else CACHE_TTL_SECONDS
+        now = datetime.now(timezone.utc)
+        generation = next(_day_generation)
+        rows = await run_in_threadpool(_read_day_rows, supabase, user_id, missing[0], missing[-1], now, max_age)
+        for day in missing:
+            if day not in rows or _invalidated_since(user_id, day, generation):
+                continue
+            shard, age = rows[day]
+            shards[day] = shard
+            if age <= CACHE_TTL_SECONDS:
+                # Never keep the L1 copy past the row's own expiry
+                _day_cache.set((user_id, day), shard, ttl=min(settings.day_cache_ttl_seconds, CACHE_TTL_SECONDS - age))
+            else:
+                stale_days.append(day)
+        missing = [day for day in days if day not in shards]
+    if missing:
+        fetched = await asyncio.gather(
+            *(_fetch_days(user_id, supabase, s, e) for s, e in _day_runs(missing))
+        )
+        for run in fetched:
+            shards.update(run)
+    for s, e in _day_runs(stale_days):
+        _refresh_days_in_background(user_id, supabase, s, e)
+    return [shards[day] for day in days], bool(stale_days)
+
+
+async def _calendar_range(user_id: str, supabase, start_dt: datetime, end_dt: datetime, allow_stale: bool = False) -> tuple[list[dict], list[dict], bool]:
+    """Return (events, busy, stale) for the range, built from cached UTC days."""
+    shards, stale = await _range_shards(user_id, supabase, start_dt, end_dt, allow_stale)
+    events, busy = _assemble(shards, _aware(start_dt), _aware(end_dt))
+    return events, busy, stale
+
+
+async def get_busy_async(user_id: str, supabase, start: str, end: str, max_days: int = FREEBUSY_MAX_DAYS) -> list:
     """Return busy slots from calendars (for internal use)."""
-    service = get_calendar_service(user_id, supabase)
-    start_dt, end_dt = clamp_range(start, end, max_days=45)
-    cal_ids = _calendar_ids_for_busy(service)
-    return _fetch_busy(service, start_dt, end_dt, cal_ids)
+    start_dt, end_dt = clamp_range(start, end, max_days=max_days)
+    _, busy, _ = await _calendar_range(user_id, supabase, start_dt, end_dt)
+    return busy
 
 
 def get_calendar_service(user_id: str, supabase):
-    r = supabase.table("calendar_tokens").select("*").eq("user_id", user_id).single().execute()
-    if not r.data:
-        raise HTTPException(400, "Google Calendar not connected. Connect in Settings.")
-    row = r.data
-    if not row.get("access_token") or not row.get("refresh_token"):
-        raise HTTPException(400, "Google Calendar token missing; reconnect your calendar.")
-    token_expiry = row.get("token_expiry")
-    if isinstance(token_expiry, str):
-        raw = token_expiry
-        try:
-            token_expiry = datetime.fromisoformat(raw.replace("Z", "+00:00"))
-        except Exception:
-            try:
-                token_expiry = datetime.fromisoformat(raw.split(".")[0] + "+00:00")
-            except Exception:
-                token_expiry = None
-    if token_expiry and token_expiry.tzinfo is not None:
-        # google-auth compares against a naive utcnow(); keep expiry naive UTC too
-        token_expiry = token_expiry.astimezone(timezone.utc).replace(tzinfo=None)
+    record = token_manager.get(user_id, supabase)
     creds = Credentials(
-        token=row.get("access_token"),
-        refresh_token=row.get("refresh_token"),
-        token_uri="https://oauth2.googleapis.com/token",
+        token=record.access_token,
+        refresh_token=record.refresh_token,
+        token_uri=TOKEN_URI,
         client_id=settings.google_client_id,
         client_secret=settings.google_client_secret,
         scopes=["https://www.googleapis.com/auth/calendar"],
-        expiry=token_expiry,
+        expiry=record.naive_expiry,
     )
-    now_naive = datetime.utcnow()
-    need_refresh = bool(row.get("refresh_token") and (not token_expiry or now_naive >= token_expiry))
-    if need_refresh:
-        resp = httpx.post(
-            "https://oauth2.googleapis.com/token",
-            data={
-                "client_id": settings.google_client_id,
-                "client_secret": settings.google_client_secret,
-                "refresh_token": creds.refresh_token,
-                "grant_type": "refresh_token",
-            },
-            headers={"Content-Type": "application/x-www-form-urlencoded"},
-        )
-        data = resp.json()
-        creds = Credentials(
-            token=data["access_token"],
-            refresh_token=creds.refresh_token,
-            token_uri="https://oauth2.googleapis.com/token",
-            client_id=settings.google_client_id,
-            client_secret=settings.google_client_secret,
-        )
-        supabase.table("calendar_tokens").update({
-            "access_token": data["access_token"],
-            "token_expiry": (datetime.now(timezone.utc) + timedelta(seconds=data.get("expires_in", 3600))).isoformat(),
-        }).eq("user_id", user_id).execute()
-    return build("calendar", "v3", credentials=creds)
+    return _service_for(user_id, creds)
 
 
 @router.get("/free-busy")
-def free_busy_route(
+async def free_busy_route(
     start: str,
     end: str,
     user_id: str = Depends(get_current_user_id),
     supabase=Depends(get_supabase),
 ):
     """Return free-busy from primary calendar."""
-    return {"busy": get_busy(user_id, supabase, start, end)}
+    return {"busy": await get_busy_async(user_id, supabase, start, end)}
 
 
 @router.get("/events")
-def list_events(
+async def list_events(
     start: str,
     end: str,
     user_id: str = Depends(get_current_user_id),
     supabase=Depends(get_supabase),
 ):
     """Return events from primary calendar."""
-    service = get_calendar_service(user_id, supabase)
     start_dt, end_dt = clamp_range(start, end, max_days=45)
-    cal_ids = _calendar_ids_for_events(service)
-    return _list_events(service, start_dt, end_dt, cal_ids)
+    events, _, _ = await _calendar_range(user_id, supabase, start_dt, end_dt)
+    return events
 
 
 @router.get("/week")
-def week_summary(
+async def week_summary(
     start: str,
     end: str,
+    request: Request,
+    response: Response,
     user_id: str = Depends(get_current_user_id),
     supabase=Depends(get_supabase),
 ):
-    """Return events, busy, and free blocks for a week."""
-    start_dt, end_dt = clamp_range(start, end, max_days=7)
-    cache_start = start_dt.isoformat()
-    cache_end = end_dt.isoformat()
-    now = datetime.now(timezone.utc)
-    try:
-        cached = (
-            supabase.table("calendar_week_cache")
-            .select("*")
-            .eq("user_id", user_id)
-            .eq("week_start", cache_start)
-            .eq("week_end", cache_end)
-            .order("fetched_at", desc=True)
-            .limit(1)
-            .execute()
-        )
-        if cached.data:
-            row = cached.data[0]
-            fetched_at = row.get("fetched_at")
-            if isinstance(fetched_at, str):
-                fetched_at = parse_iso(fetched_at)
-            if fetched_at and fetched_at.tzinfo is None:
-                fetched_at = fetched_at.replace(tzinfo=timezone.utc)
-            if fetched_at and (now - fetched_at).total_seconds() <= CACHE_TTL_SECONDS:
-                return {
-                    "events": row.get("events", []),
-                    "busy": row.get("busy", []),
-                    "free": row.get("free", []),
-                }
-    except Exception:
-        pass
+    """Return events, busy, and free blocks for a week.
 
-    service = get_calendar_service(user_id, supabase)
-    cal_ids_events = _calendar_ids_for_events(service)
-    cal_ids_busy = _calendar_ids_for_busy(service)
-    events = _list_events(service, start_dt, end_dt, cal_ids_events)
-    busy = _fetch_busy(service, start_dt, end_dt, cal_ids_busy)
-    free = _free_from_busy(busy, start_dt, end_dt)
-    payload = {"events": events, "busy": busy, "free": free}
-    try:
-        supabase.table("calendar_week_cache").upsert(
-            {
-                "user_id": user_id,
-                "week_start": cache_start,
-                "week_end": cache_end,
-                "events": events,
-                "busy": busy,
-                "free": free,
-                "fetched_at": now.isoformat(),
-            }
-        ).execute()
-    except Exception:
-        pass
+    Served from cached days; ``stale: true`` marks data past CACHE_TTL_SECONDS
+    that is being refreshed in the background. The ETag covers the days'
+    fetch times, so a 304 skips assembling the week.
+    """
+    start_dt, end_dt = clamp_range(start, end, max_days=7)
+    shards, stale = await _range_shards(user_id, supabase, start_dt, end_dt, allow_stale=True)
+    tag = etag("week", user_id, start_dt.isoformat(), end_dt.isoformat(), stale, *(s.get("fetched_at") for s in shards))
+    unchanged = not_modified(request, response, tag)
+    if unchanged:
+        return unchanged
+    events, busy = _assemble(shards, _aware(start_dt), _aware(end_dt))
+    payload = {"events": events, "busy": busy, "free": free_blocks(busy, start_dt, end_dt)}
+    if stale:
+        payload["stale"] = True
     return payload
 
 
@@ -322,5 +728,8 @@ def add_event(
         "start": {"dateTime": start, "timeZone": "UTC"},
         "end": {"dateTime": end, "timeZone": "UTC"},
     }
-    created = service.events().insert(calendarId="primary", body=event).execute()
+    created, exc = insert_events(service, [event])[0]
+    if exc is not None:
+        raise exc
+    calendar_changed(user_id, supabase, [(start, end)])
     return created
@@ -0,0 +1,238 @@
+"""Incremental Google Calendar sync into a local event store (calendar_events)."""
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+from api.cache import TTLCache
+from api.gcal_async import SyncTokenExpired, calendar_client
+from api.time_utils import parse_iso
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Rows per PostgREST upsert when writing synced events
+WRITE_CHUNK = 500
+# Event ids per PostgREST delete; they travel in the query string
+DELETE_CHUNK = 200
+# Rows per read page; must not exceed PostgREST's max-rows (1000 by default),
+# since a page shorter than this ends the read
+READ_PAGE = 1000
+
+# user_id -> monotonic time of the last completed sync
+_last_sync = TTLCache(maxsize=4096, ttl=86400)
+_sync_locks = TTLCache(maxsize=4096, ttl=3600)
+
+
+def _as_utc(value: str, all_day: bool) -> datetime:
+    dt = datetime.fromisoformat(value) if all_day else parse_iso(value)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+def _event_row(user_id: str, calendar_id: str, e: dict) -> Optional[dict]:
+    start_obj = e.get("start") or {}
+    end_obj = e.get("end") or {}
+    all_day = "dateTime" not in start_obj
+    key = "date" if all_day else "dateTime"
+    start_value = start_obj.get(key)
+    end_value = end_obj.get(key)
+    if not start_value or not end_value:
+        return None
+    try:
+        start_at = _as_utc(start_value, all_day)
+        end_at = _as_utc(end_value, all_day)
+    except Exception:
+        return None
+    declined = any(
+        a.get("self") and a.get("responseStatus") == "declined" for a in e.get("attendees") or []
+    )
+    return {
+        "user_id": user_id,
+        "calendar_id": calendar_id,
+        "event_id": e.get("id"),
+        "summary": e.get("summary", "Busy"),
+        "start_value": start_value,
+        "end_value": end_value,
+        "start_at": start_at.isoformat(),
+        "end_at": end_at.isoformat(),
+        "all_day": all_day,
+        "busy": e.get("transparency") != "transparent" and not declined,
+        "updated_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def _window_start() -> datetime:
+    """Earliest instant the store is expected to hold."""
+    now = datetime.now(timezone.utc)
+    day = datetime(now.year, now.month, now.day, tzinfo=timezone.utc)
+    return day - timedelta(days=settings.calendar_sync_lookback_days)
+
+
+def _upsert_rows(supabase, rows: list[dict]) -> None:
+    for i in range(0, len(rows), WRITE_CHUNK):
+        supabase.table("calendar_events").upsert(
+            rows[i:i + WRITE_CHUNK], on_conflict="user_id,calendar_id,event_id"
+        ).execute()
+
+
+def _read_all(query) -> list[dict]:
+    """Every row of ``query()``, one READ_PAGE at a time.
+
+    A single select is silently cut at PostgREST's max-rows; ``query`` must
+    build a fresh, fully ordered builder on each call.
+    """
+    rows: list[dict] = []
+    while True:
+        page = query().range(len(rows), len(rows) + READ_PAGE - 1).execute().data or []
+        rows.extend(page)
+        if len(page) < READ_PAGE:
+            return rows
+
+
+def _load_state(supabase, user_id: str) -> dict[str, dict]:
+    rows = _read_all(
+        lambda: supabase.table("calendar_sync_state").select("*").eq("user_id", user_id).order("calendar_id")
+    )
+    return {row["calendar_id"]: row for row in rows}
+
+
+def _save_state(supabase, user_id: str, calendar_id: str, sync_token: Optional[str], window_start: str) -> None:
+    supabase.table("calendar_sync_state").upsert(
+        {
+            "user_id": user_id,
+            "calendar_id": calendar_id,
+            "sync_token": sync_token,
+            "window_start": window_start,
+            "synced_at": datetime.now(timezone.utc).isoformat(),
+        },
+        on_conflict="user_id,calendar_id",
+    ).execute()
+
+
+def _delete_events(supabase, user_id: str, calendar_id: str, event_ids: list[str]) -> None:
+    for i in range(0, len(event_ids), DELETE_CHUNK):
+        supabase.table("calendar_events").delete().eq("user_id", user_id).eq(
+            "calendar_id", calendar_id
+        ).in_("event_id", event_ids[i:i + DELETE_CHUNK]).execute()
+
+
+def _apply_full(supabase, user_id: str, calendar_id: str, rows: list[dict], sync_token: Optional[str], window_start: str) -> None:
+    """Replace the calendar's stored events with ``rows``.
+
+    New rows are upserted before stale ones are deleted, so a failure midway
+    leaves extra events behind rather than an empty calendar.
+    """
+    _upsert_rows(supabase, rows)
+    stored = _read_all(
+        lambda: supabase.table("calendar_events").select("event_id").eq("user_id", user_id).eq(
+            "calendar_id", calendar_id
+        ).order("event_id")
+    )
+    keep = {row["event_id"] for row in rows}
+    _delete_events(supabase, user_id, calendar_id, [r["event_id"] for r in stored if r["event_id"] not in keep])
+    _save_state(supabase, user_id, calendar_id, sync_token, window_start)
+
+
+def _apply_delta(supabase, user_id: str, calendar_id: str, rows: list[dict], deleted: list[str], sync_token: Optional[str], window_start: str) -> None:
+    _delete_events(supabase, user_id, calendar_id, deleted)
+    _upsert_rows(supabase, rows)
+    _save_state(supabase, user_id, calendar_id, sync_token, window_start)
+
+
+async def _sync_calendar(user_id: str, token: str, supabase, calendar_id: str, state: Optional[dict], window_start: datetime) -> None:
+    if state and state.get("sync_token"):
+        try:
+            items, next_token = await calendar_client.sync_events(
+                user_id, token, calendar_id, sync_token=state["sync_token"]
+            )
+        except SyncTokenExpired:
+            logger.info("Sync token expired for %s/%s; running full sync", user_id, calendar_id)
+        else:
+            rows, deleted = [], []
+            for e in items:
+                row = None if e.get("status") == "cancelled" else _event_row(user_id, calendar_id, e)
+                if row is None:
+                    deleted.append(e.get("id"))
+                else:
+                    rows.append(row)
+            await run_in_threadpool(
+                _apply_delta, supabase, user_id, calendar_id, rows, deleted,
+                next_token or state["sync_token"], state["window_start"],
+            )
+            return
+    items, next_token = await calendar_client.sync_events(user_id, token, calendar_id, time_min=window_start)
+    rows = [
+        row
+        for row in (_event_row(user_id, calendar_id, e) for e in items if e.get("status") != "cancelled")
+        if row is not None
+    ]
+    await run_in_threadpool(
+        _apply_full, supabase, user_id, calendar_id, rows, next_token, window_start.isoformat()
+    )
+
+
+async def ensure_synced(user_id: str, token: str, supabase, cal_ids: list[str], start_dt: datetime) -> bool:
+    """Bring the user's stored events up to date with Google.
+
+    Returns False when ``start_dt`` lies before the synced window, in which
+    case callers must read from Google directly.
+    """
+    window_start = _window_start()
+    if start_dt < window_start:
+        return False
+    last = _last_sync.get(user_id)
+    if last is not None and time.monotonic() - last < settings.calendar_sync_interval_seconds:
+        return True
+    lock = _sync_locks.get(user_id)
+    if lock is None:
+        lock = asyncio.Lock()
+        _sync_locks.set(user_id, lock)
+    async with lock:
+        last = _last_sync.get(user_id)
+        if last is not None and time.monotonic() - last < settings.calendar_sync_interval_seconds:
+            return True
+        states = await run_in_threadpool(_load_state, supabase, user_id)
+        results = await asyncio.gather(
+            *(_sync_calendar(user_id, token, supabase, cid, states.get(cid), window_start) for cid in cal_ids),
+            return_exceptions=True,
+        )
+        failed = False
+        for cid, result in zip(cal_ids, results):
+            if isinstance(result, Exception):
+                failed = True
+                logger.warning("Calendar sync failed for %s/%s: %s", user_id, cid, result)
+        if failed:
+            # Store may be missing or behind for some calendar; read live this time
+            return False
+        _last_sync.set(user_id, time.monotonic())
+    return True
+
+
+def read_events(supabase, user_id: str, cal_ids: list[str], start_dt: datetime, end_dt: datetime) -> list[dict]:
+    return _read_all(
+        lambda: supabase.table("calendar_events")
+        .select("calendar_id,event_id,summary,start_value,end_value,start_at,end_at,all_day,busy")
+        .eq("user_id", user_id)
+        .in_("calendar_id", cal_ids)
+        .lt("start_at", end_dt.isoformat())
+        .gt("end_at", start_dt.isoformat())
+        .order("start_at")
+        .order("calendar_id")
+        .order("event_id")
+    )
+
+
+def mark_stale(user_id: str) -> None:
+    """Force the next read to sync (after we changed the user's calendar ourselves)."""
+    _last_sync.pop(user_id)
+
+
+def forget_user(supabase, user_id: str) -> None:
+    _last_sync.pop(user_id)
+    supabase.table("calendar_events").delete().eq("user_id", user_id).execute()
+    supabase.table("calendar_sync_state").delete().eq("user_id", user_id).execute()
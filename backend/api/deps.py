@@ -1,30 +1,215 @@
+import hashlib
+import logging
+import threading
+import time
 from typing import Optional
+import httpx
 import jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from supabase import create_client, Client
 
+from api.cache import TTLCache
 from config import settings
 
 security = HTTPBearer(auto_error=False)
-_jwks_client = None
+logger = logging.getLogger(__name__)
+
+ASYMMETRIC_ALGORITHMS = ("RS256", "ES256", "EdDSA")
+
+
+class SupabasePool:
+    """Process-wide Supabase clients shared across requests.
+
+    Each client owns a PostgREST HTTP session with keep-alive connections, so
+    reusing clients avoids client construction and a TLS handshake per request.
+    Clients are handed out round-robin; the service key never changes per
+    request, so a client can serve several threads at once.
+    """
+
+    def __init__(self, size: int):
+        self.size = max(1, size)
+        self._clients: list[Client] = []
+        self._lock = threading.Lock()
+        self._next = 0
+        self._checkouts = 0
+        self._created = 0
+        self._started_at: Optional[float] = None
+
+    def start(self) -> None:
+        with self._lock:
+            if self._clients:
+                return
+            for _ in range(self.size):
+                self._clients.append(create_client(settings.supabase_url, settings.supabase_service_key))
+                self._created += 1
+            self._started_at = time.time()
+
+    def get(self) -> Client:
+        if not self._clients:
+            # Used outside the app lifespan (scripts, callbacks before startup)
+            self.start()
+        with self._lock:
+            client = self._clients[self._next % len(self._clients)]
+            self._next += 1
+            self._checkouts += 1
+        return client
+
+    def close(self) -> None:
+        with self._lock:
+            clients, self._clients = self._clients, []
+        for client in clients:
+            try:
+                client.postgrest.session.close()
+            except Exception:
+                pass
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._clients),
+            "clients_created": self._created,
+            "checkouts": self._checkouts,
+            "uptime_seconds": round(time.time() - self._started_at, 1) if self._started_at else 0,
+        }
+
+
+supabase_pool = SupabasePool(settings.supabase_pool_size)
 
 
 def get_supabase() -> Client:
-    return create_client(settings.supabase_url, settings.supabase_service_key)
+    return supabase_pool.get()
+
+
+class JWKSCache:
+    """Supabase Auth signing keys by ``kid``, fetched once per process.
+
+    Keys older than ``jwks_refresh_seconds`` keep being served while a
+    background thread refetches them. An unknown ``kid`` (key rotation)
+    triggers a synchronous refetch, at most once per ``jwks_min_refresh_seconds``.
+    """
+
+    def __init__(self, url: str):
+        self.url = url
+        self._keys: dict[str, jwt.PyJWK] = {}
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self.fetches = 0
+
+    def _fetch(self) -> None:
+        resp = httpx.get(self.url, timeout=5.0)
+        resp.raise_for_status()
+        keys = {}
+        for key in jwt.PyJWKSet.from_dict(resp.json()).keys:
+            keys[key.key_id] = key
+        with self._lock:
+            self._keys = keys
+            self._fetched_at = time.monotonic()
+            self.fetches += 1
+
+    def _refresh_in_background(self) -> None:
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                self._fetch()
+            except Exception:
+                logger.warning("JWKS refresh failed; keeping cached keys", exc_info=True)
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=run, name="jwks-refresh", daemon=True).start()
+
+    def get(self, kid: Optional[str]) -> Optional[jwt.PyJWK]:
+        age = time.monotonic() - self._fetched_at
+        key = self._keys.get(kid)
+        if key is None and (not self._keys or age >= settings.jwks_min_refresh_seconds):
+            self._fetch()
+            key = self._keys.get(kid)
+        elif age >= settings.jwks_refresh_seconds:
+            self._refresh_in_background()
+        return key
+
+    def stats(self) -> dict:
+        return {"keys": len(self._keys), "fetches": self.fetches}
+
+
+_jwks_cache = JWKSCache(f"{settings.supabase_url.rstrip('/')}/auth/v1/.well-known/jwks.json")
+# Verified claims keyed by token digest; each entry expires with the token
+_claims_cache = TTLCache(maxsize=settings.jwt_claims_cache_size, ttl=3600)
+
+
+def _verify(token: str) -> dict:
+    options = {"verify_aud": False, "require": ["exp", "sub"]}
+    if not settings.jwt_verify_signature:
+        # Local development only: trust whatever Supabase handed the browser
+        return jwt.decode(token, options={**options, "verify_signature": False})
+    header = jwt.get_unverified_header(token)
+    alg = header.get("alg")
+    if alg == "HS256":
+        if not settings.supabase_jwt_secret:
+            raise jwt.InvalidTokenError("HS256 token but SUPABASE_JWT_SECRET is not set")
+        return jwt.decode(token, settings.supabase_jwt_secret, algorithms=["HS256"], options=options)
+    if alg in ASYMMETRIC_ALGORITHMS:
+        try:
+            key = _jwks_cache.get(header.get("kid"))
+        except Exception as e:
+            raise HTTPException(status_code=503, detail="Auth signing keys unavailable") from e
+        if key is None:
+            raise jwt.InvalidTokenError("Unknown signing key")
+        return jwt.decode(token, key.key, algorithms=[alg], options=options)
+    raise jwt.InvalidTokenError(f"Unsupported algorithm {alg}")
+
+
+def check_auth_config() -> None:
+    """Fail at startup when signatures are verified but HS256 tokens cannot be.
+
+    Projects still on the legacy JWT secret publish an empty JWKS, so every
+    token is HS256 and needs SUPABASE_JWT_SECRET; without it each request
+    would get a 401.
+    """
+    if not settings.jwt_verify_signature or settings.supabase_jwt_secret:
+        return
+    try:
+        _jwks_cache._fetch()
+    except jwt.PyJWKSetError:
+        raise RuntimeError(
+            "Supabase publishes no asymmetric signing keys, so access tokens are HS256: "
+            "set SUPABASE_JWT_SECRET (or JWT_VERIFY_SIGNATURE=false for local development)"
+        )
+    except Exception:
+        logger.warning("Could not fetch Supabase JWKS at startup; HS256 tokens will fail without SUPABASE_JWT_SECRET", exc_info=True)
 
 
 def decode_access_token(token: str) -> dict:
+    """Return the verified claims of a Supabase access token.
+
+    Verified tokens are remembered until their ``exp``, so repeat requests
+    skip signature checks.
+    """
     if not token:
         raise HTTPException(status_code=401, detail="Missing token")
-    # In this environment we skip signature verification (Supabase already authenticated the user).
+    digest = hashlib.sha256(token.encode()).digest()
+    claims = _claims_cache.get(digest)
+    if claims is not None:
+        return claims
     try:
-        return jwt.decode(
-            token,
-            options={"verify_signature": False, "verify_aud": False},
-        )
+        claims = _verify(token)
+    except HTTPException:
+        raise
     except Exception:
         raise HTTPException(status_code=401, detail="Invalid token")
+    ttl = float(claims["exp"]) - time.time()
+    if ttl > 0:
+        _claims_cache.set(digest, claims, ttl=ttl)
+    return claims
+
+
+def auth_stats() -> dict:
+    return {"claims_cache": _claims_cache.stats(), "jwks": _jwks_cache.stats()}
 
 
 def get_current_user_id(
@@ -0,0 +1,146 @@
+"""Local estimated_minutes from a user's past tasks, so routine estimates skip Gemini.
+
+Each task becomes a sparse TF-IDF vector over name tokens and bigrams,
+description tokens, difficulty and focus length. A new task's estimate is the
+similarity-weighted mean of its nearest past tasks, trusted only when those
+neighbours are close and agree.
+"""
+import heapq
+import math
+import re
+from collections import defaultdict
+from typing import Optional
+
+from api.cache import TTLCache
+from config import settings
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+# Nearest past tasks averaged into an estimate
+NEIGHBOURS = 5
+# Below this cosine similarity a past task is not considered related
+MIN_SIMILARITY = 0.3
+# Past tasks indexed per user (most recent first)
+MAX_INDEXED_TASKS = 500
+
+_indexes = TTLCache(maxsize=1024, ttl=600)
+
+
+def _features(task: dict) -> dict[str, float]:
+    feats: dict[str, float] = defaultdict(float)
+    name = TOKEN_RE.findall((task.get("name") or "").lower())
+    for tok in name:
+        feats[f"n:{tok}"] += 2.0
+    for a, b in zip(name, name[1:]):
+        feats[f"b:{a}_{b}"] += 3.0
+    for tok in TOKEN_RE.findall((task.get("description") or "").lower()):
+        feats[f"d:{tok}"] += 1.0
+    if task.get("difficulty"):
+        feats[f"difficulty:{task['difficulty']}"] += 1.0
+    if task.get("focus_minutes"):
+        feats[f"focus:{int(task['focus_minutes']) // 15}"] += 1.0
+    elif task.get("focus_level"):
+        feats[f"focus:{task['focus_level']}"] += 1.0
+    return feats
+
+
+class EstimateIndex:
+    """Inverted index of past tasks' feature vectors and their recorded minutes."""
+
+    __slots__ = ("ids", "minutes", "norms", "postings", "idf")
+
+    def __init__(self, tasks: list[dict]):
+        self.ids: list[str] = []
+        self.minutes: list[int] = []
+        docs = []
+        df: dict[str, int] = defaultdict(int)
+        for t in tasks:
+            if t.get("estimated_minutes") is None:
+                continue
+            feats = _features(t)
+            if not feats:
+                continue
+            self.ids.append(t.get("id"))
+            self.minutes.append(int(t["estimated_minutes"]))
+            docs.append(feats)
+            for term in feats:
+                df[term] += 1
+        n = len(docs)
+        self.idf = {term: math.log((n + 1) / (count + 1)) + 1.0 for term, count in df.items()}
+        self.postings: dict[str, list[tuple[int, float]]] = defaultdict(list)
+        self.norms: list[float] = []
+        for doc_id, feats in enumerate(docs):
+            norm = 0.0
+            for term, weight in feats.items():
+                w = weight * self.idf[term]
+                self.postings[term].append((doc_id, w))
+                norm += w * w
+            self.norms.append(math.sqrt(norm))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def estimate(self, task: dict, exclude_id: Optional[str] = None) -> Optional[tuple[int, float]]:
+        """Return (minutes, confidence in [0, 1]) or None when nothing is similar."""
+        query = {term: w * self.idf[term] for term, w in _features(task).items() if term in self.idf}
+        if not query:
+            return None
+        q_norm = math.sqrt(sum(w * w for w in query.values()))
+        scores: dict[int, float] = defaultdict(float)
+        for term, qw in query.items():
+            for doc_id, dw in self.postings[term]:
+                scores[doc_id] += qw * dw
+        ranked = heapq.nlargest(
+            NEIGHBOURS,
+            (
+                (dot / (q_norm * self.norms[doc_id]), doc_id)
+                for doc_id, dot in scores.items()
+                if self.ids[doc_id] != exclude_id
+            ),
+        )
+        ranked = [(sim, doc_id) for sim, doc_id in ranked if sim >= MIN_SIMILARITY]
+        if not ranked:
+            return None
+        total = sum(sim for sim, _ in ranked)
+        mean = sum(sim * self.minutes[doc_id] for sim, doc_id in ranked) / total
+        spread = sum(sim * abs(self.minutes[doc_id] - mean) for sim, doc_id in ranked) / total
+        agreement = 1.0 - min(1.0, spread / max(mean, 1.0))
+        minutes = max(5, int(round(mean / 5.0)) * 5)
+        return minutes, ranked[0][0] * agreement
+
+
+def _load_index(supabase, user_id: str) -> EstimateIndex:
+    r = (
+        supabase.table("tasks")
+        .select("id,name,description,difficulty,focus_level,focus_minutes,estimated_minutes")
+        .eq("user_id", user_id)
+        .not_.is_("estimated_minutes", "null")
+        .order("created_at", desc=True)
+        .limit(MAX_INDEXED_TASKS)
+        .execute()
+    )
+    return EstimateIndex(r.data or [])
+
+
+def estimate_locally(supabase, user_id: str, task: dict) -> Optional[tuple[int, float]]:
+    """(minutes, confidence) when the user's history answers confidently, else None."""
+    index = _indexes.get(user_id)
+    if index is None:
+        try:
+            index = _load_index(supabase, user_id)
+        except Exception:
+            # Older schema (no focus_minutes / estimated_minutes): use Gemini
+            return None
+        _indexes.set(user_id, index)
+    result = index.estimate(task, exclude_id=task.get("id"))
+    if result is None or result[1] < settings.local_estimate_min_confidence:
+        return None
+    return result
+
+
+def forget_index(user_id: str) -> None:
+    """Drop a user's index after their recorded estimates changed."""
+    _indexes.pop(user_id)
+
+
+def estimator_stats() -> dict:
+    return _indexes.stats()
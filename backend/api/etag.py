@@ -0,0 +1,55 @@
+"""Conditional GET: weak ETags from cheap version tags, 304 without building the body."""
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response
+
+
+def etag(*parts) -> str:
+    """Weak validator over version parts (ids, timestamps, counts, query string)."""
+    digest = hashlib.sha1("\x1f".join(str(p) for p in parts).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def _matches(header: str, tag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # Weak comparison: W/ prefixes are ignored on both sides
+    wanted = tag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == wanted for candidate in header.split(","))
+
+
+def not_modified(request: Request, response: Response, tag: Optional[str]) -> Optional[Response]:
+    """Set ETag on ``response``; return a bare 304 when the client already has ``tag``.
+
+    A None tag (version unknown, e.g. migration not applied) disables the check.
+    """
+    if tag is None:
+        return None
+    response.headers["ETag"] = tag
+    response.headers["Cache-Control"] = "private, no-cache"
+    header = request.headers.get("if-none-match")
+    if header and _matches(header, tag):
+        return Response(status_code=304, headers={"ETag": tag, "Cache-Control": "private, no-cache"})
+    return None
+
+
+def table_version(supabase, table: str, user_id: str) -> Optional[tuple]:
+    """(max updated_at, row count) of the user's rows in ``table``, in one request.
+
+    updated_at is kept by a trigger (migration 014); inserts and updates move
+    the maximum and deletes change the count. None when the column is missing.
+    """
+    try:
+        r = (
+            supabase.table(table)
+            .select("updated_at", count="exact")
+            .eq("user_id", user_id)
+            .order("updated_at", desc=True)
+            .limit(1)
+            .execute()
+        )
+    except Exception:
+        return None
+    rows = r.data or []
+    return (rows[0].get("updated_at") if rows else None, r.count or 0)
@@ -0,0 +1,159 @@
+"""Async Google Calendar REST client on a shared httpx.AsyncClient."""
+import asyncio
+from datetime import datetime
+from typing import Optional
+from urllib.parse import quote
+
+import httpx
+
+from api.cache import TTLCache
+from config import settings
+
+CALENDAR_API = "https://www.googleapis.com/calendar/v3"
+
+
+class SyncTokenExpired(Exception):
+    """Google answered 410 Gone: the sync token is invalid and a full sync is needed."""
+
+
+class AsyncCalendarClient:
+    """Thin transport for the Calendar endpoints we read.
+
+    One pooled AsyncClient serves every user; per-user semaphores bound how
+    many requests a single user can have in flight at once.
+    """
+
+    def __init__(self):
+        self._http: Optional[httpx.AsyncClient] = None
+        self._user_limits = TTLCache(maxsize=4096, ttl=3600)
+
+    def start(self) -> None:
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                base_url=CALENDAR_API,
+                timeout=httpx.Timeout(15.0, connect=5.0),
+                limits=httpx.Limits(max_keepalive_connections=50, max_connections=200),
+            )
+
+    async def aclose(self) -> None:
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    def _limit_for(self, user_id: str) -> asyncio.Semaphore:
+        sem = self._user_limits.get(user_id)
+        if sem is None:
+            sem = asyncio.Semaphore(settings.calendar_fetch_concurrency)
+            self._user_limits.set(user_id, sem)
+        return sem
+
+    async def _request(self, user_id: str, token: str, method: str, path: str, **kwargs) -> httpx.Response:
+        self.start()
+        headers = {"Authorization": f"Bearer {token}", **kwargs.pop("headers", {})}
+        async with self._limit_for(user_id):
+            return await self._http.request(method, path, headers=headers, **kwargs)
+
+    async def calendar_list(self, user_id: str, token: str, etag: Optional[str] = None) -> Optional[dict]:
+        """Return {"items", "etag", "paged"}, or None if ``etag`` is still current."""
+        params = {"minAccessRole": "freeBusyReader", "showHidden": "true"}
+        headers = {"If-None-Match": etag} if etag else {}
+        resp = await self._request(user_id, token, "GET", "/users/me/calendarList", params=params, headers=headers)
+        if resp.status_code == 304:
+            return None
+        resp.raise_for_status()
+        data = resp.json()
+        items = list(data.get("items", []))
+        page_token = data.get("nextPageToken")
+        paged = bool(page_token)
+        while page_token:
+            resp = await self._request(
+                user_id, token, "GET", "/users/me/calendarList",
+                params={**params, "pageToken": page_token},
+            )
+            resp.raise_for_status()
+            page = resp.json()
+            items.extend(page.get("items", []))
+            page_token = page.get("nextPageToken")
+        return {"items": items, "etag": data.get("etag"), "paged": paged}
+
+    async def list_events(self, user_id: str, token: str, calendar_id: str, start_dt: datetime, end_dt: datetime) -> list[dict]:
+        params = {
+            "timeMin": start_dt.isoformat(),
+            "timeMax": end_dt.isoformat(),
+            "singleEvents": "true",
+            "orderBy": "startTime",
+            "maxResults": 2500,
+        }
+        path = f"/calendars/{quote(calendar_id, safe='')}/events"
+        items: list[dict] = []
+        page_token = None
+        while True:
+            resp = await self._request(
+                user_id, token, "GET", path,
+                params={**params, "pageToken": page_token} if page_token else params,
+            )
+            resp.raise_for_status()
+            data = resp.json()
+            items.extend(data.get("items", []))
+            page_token = data.get("nextPageToken")
+            if not page_token:
+                return items
+
+    async def sync_events(
+        self,
+        user_id: str,
+        token: str,
+        calendar_id: str,
+        sync_token: Optional[str] = None,
+        time_min: Optional[datetime] = None,
+    ) -> tuple[list[dict], Optional[str]]:
+        """Full (``time_min``) or incremental (``sync_token``) events.list.
+
+        Returns every changed item, cancelled ones included, and the next sync token.
+        """
+        params: dict = {"singleEvents": "true", "maxResults": 2500}
+        if sync_token:
+            params["syncToken"] = sync_token
+        elif time_min is not None:
+            params["timeMin"] = time_min.isoformat()
+        path = f"/calendars/{quote(calendar_id, safe='')}/events"
+        items: list[dict] = []
+        page_token = None
+        while True:
+            resp = await self._request(
+                user_id, token, "GET", path,
+                params={**params, "pageToken": page_token} if page_token else params,
+            )
+            if resp.status_code == 410:
+                raise SyncTokenExpired(calendar_id)
+            resp.raise_for_status()
+            data = resp.json()
+            items.extend(data.get("items", []))
+            page_token = data.get("nextPageToken")
+            if not page_token:
+                return items, data.get("nextSyncToken")
+
+    async def list_events_many(self, user_id: str, token: str, cal_ids: list[str], start_dt: datetime, end_dt: datetime) -> list[list[dict]]:
+        """List events for every calendar concurrently; a failing calendar yields []."""
+        results = await asyncio.gather(
+            *(self.list_events(user_id, token, cid, start_dt, end_dt) for cid in cal_ids),
+            return_exceptions=True,
+        )
+        return [r if isinstance(r, list) else [] for r in results]
+
+    async def freebusy(self, user_id: str, token: str, start_dt: datetime, end_dt: datetime, cal_ids: list[str]) -> list[dict]:
+        body = {
+            "timeMin": start_dt.isoformat(),
+            "timeMax": end_dt.isoformat(),
+            "items": [{"id": cid} for cid in cal_ids],
+        }
+        resp = await self._request(user_id, token, "POST", "/freeBusy", json=body)
+        resp.raise_for_status()
+        calendars = resp.json().get("calendars", {})
+        busy: list[dict] = []
+        for cid in cal_ids:
+            busy.extend(calendars.get(cid, {}).get("busy", []))
+        return busy
+
+
+calendar_client = AsyncCalendarClient()
@@ -0,0 +1,182 @@
+"""Shared async Gemini client: one configured model, bounded concurrency, deadlines and retries."""
+import asyncio
+import logging
+import random
+import threading
+from typing import AsyncIterator, Optional
+
+from fastapi import HTTPException
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# HTTP statuses worth retrying (rate limit, server errors, upstream timeouts)
+RETRYABLE_CODES = {429, 500, 502, 503, 504}
+
+
+def _retryable(exc: Exception) -> bool:
+    code = getattr(exc, "code", None)
+    if isinstance(code, int):
+        return code in RETRYABLE_CODES
+    return isinstance(exc, (ConnectionError, TimeoutError))
+
+
+def response_text(resp) -> str:
+    try:
+        return getattr(resp, "text", "") or ""
+    except ValueError:
+        # Blocked or empty candidates: .text raises instead of returning ""
+        return ""
+
+
+class GeminiClient:
+    """Process-wide Gemini access.
+
+    ``genai.configure`` runs once and models are reused per name. A global
+    semaphore caps calls in flight; each call has one deadline covering its
+    retries, which back off exponentially with full jitter.
+    """
+
+    def __init__(self):
+        self._models: dict[str, object] = {}
+        self._lock = threading.Lock()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.calls = 0
+        self.retries = 0
+        self.timeouts = 0
+        self.failures = 0
+        self.in_flight = 0
+        self.prompt_tokens = 0
+        self.response_tokens = 0
+
+    def model(self):
+        name = settings.gemini_model or "gemini-1.5-pro"
+        model = self._models.get(name)
+        if model is not None:
+            return model
+        if not settings.gemini_api_key:
+            raise HTTPException(500, "Gemini API key not configured")
+        try:
+            import google.generativeai as genai  # type: ignore
+        except Exception:
+            raise HTTPException(500, "Gemini SDK not installed. Run: pip install -r backend/requirements.txt")
+        with self._lock:
+            model = self._models.get(name)
+            if model is None:
+                genai.configure(api_key=settings.gemini_api_key)
+                model = genai.GenerativeModel(name)
+                self._models[name] = model
+        return model
+
+    def _limit(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(settings.gemini_concurrency)
+        return self._semaphore
+
+    def _record_usage(self, resp, label: str) -> None:
+        usage = getattr(resp, "usage_metadata", None)
+        if usage is None:
+            return
+        prompt = getattr(usage, "prompt_token_count", 0) or 0
+        response = getattr(usage, "candidates_token_count", 0) or 0
+        self.prompt_tokens += prompt
+        self.response_tokens += response
+        logger.info("Gemini %s: prompt_tokens=%d response_tokens=%d", label, prompt, response)
+
+    def _timed_out(self) -> HTTPException:
+        self.timeouts += 1
+        return HTTPException(504, "Gemini request timed out")
+
+    async def generate(self, contents, generation_config: Optional[dict] = None, timeout: Optional[float] = None, label: str = "generate"):
+        """Run generate_content and return the response, retrying transient errors until the deadline."""
+        model = self.model()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + (timeout or settings.gemini_timeout_seconds)
+        self.calls += 1
+        attempt = 0
+        while True:
+            try:
+                async with self._limit():
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        raise self._timed_out()
+                    self.in_flight += 1
+                    try:
+                        resp = await asyncio.wait_for(
+                            model.generate_content_async(
+                                contents,
+                                generation_config=generation_config,
+                                request_options={"timeout": remaining},
+                            ),
+                            timeout=remaining,
+                        )
+                        self._record_usage(resp, label)
+                        return resp
+                    finally:
+                        self.in_flight -= 1
+            except asyncio.TimeoutError:
+                raise self._timed_out()
+            except HTTPException:
+                raise
+            except Exception as e:
+                backoff = random.uniform(0, settings.gemini_retry_base_seconds * 2 ** attempt)
+                if attempt >= settings.gemini_max_retries or not _retryable(e):
+                    self.failures += 1
+                    raise HTTPException(500, f"Gemini request failed: {e}") from e
+                if loop.time() + backoff >= deadline:
+                    raise self._timed_out()
+                logger.info("Gemini call failed (%s); retry %d in %.2fs", e, attempt + 1, backoff)
+                attempt += 1
+                self.retries += 1
+                await asyncio.sleep(backoff)
+
+    async def stream(self, contents, generation_config: Optional[dict] = None, timeout: Optional[float] = None, label: str = "stream") -> AsyncIterator[str]:
+        """Yield response text chunks as they arrive; the deadline covers the whole stream."""
+        model = self.model()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + (timeout or settings.gemini_timeout_seconds)
+        self.calls += 1
+        async with self._limit():
+            self.in_flight += 1
+            try:
+                try:
+                    resp = await asyncio.wait_for(
+                        model.generate_content_async(contents, generation_config=generation_config, stream=True),
+                        timeout=max(0.0, deadline - loop.time()),
+                    )
+                    chunks = resp.__aiter__()
+                    last = None
+                    while True:
+                        try:
+                            chunk = await asyncio.wait_for(chunks.__anext__(), timeout=max(0.0, deadline - loop.time()))
+                        except StopAsyncIteration:
+                            # Usage totals arrive with the final chunk
+                            self._record_usage(last, label)
+                            return
+                        last = chunk
+                        yield response_text(chunk)
+                except asyncio.TimeoutError:
+                    raise self._timed_out()
+                except HTTPException:
+                    raise
+                except Exception as e:
+                    self.failures += 1
+                    raise HTTPException(500, f"Gemini request failed: {e}") from e
+            finally:
+                self.in_flight -= 1
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "retries": self.retries,
+            "timeouts": self.timeouts,
+            "failures": self.failures,
+            "in_flight": self.in_flight,
+            "prompt_tokens": self.prompt_tokens,
+            "response_tokens": self.response_tokens,
+            "concurrency": settings.gemini_concurrency,
+        }
+
+
+gemini_client = GeminiClient()
@@ -0,0 +1,142 @@
+"""Sorted, merged busy intervals for free/busy and slot computations."""
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone, tzinfo
+from typing import Iterable, Iterator, Optional
+
+from api.time_utils import parse_iso
+
+
+def to_epoch(dt: datetime) -> int:
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
+
+
+def from_epoch(ts: int, tz: Optional[tzinfo] = None) -> datetime:
+    return datetime.fromtimestamp(ts, tz or timezone.utc)
+
+
+class AvailabilityIndex:
+    """Busy time as disjoint, sorted [start, end) intervals in epoch seconds.
+
+    Starts and ends live in two parallel ``array('q')`` buffers. Lookups are
+    binary searches; ``add``/``subtract`` locate their position in O(log n)
+    and shift the tail of the buffers in one memmove.
+    """
+
+    __slots__ = ("starts", "ends")
+
+    def __init__(self):
+        self.starts = array("q")
+        self.ends = array("q")
+
+    @classmethod
+    def from_pairs(cls, pairs: Iterable[tuple[int, int]]) -> "AvailabilityIndex":
+        index = cls()
+        for s, e in sorted(p for p in pairs if p[1] > p[0]):
+            if index.ends and s <= index.ends[-1]:
+                if e > index.ends[-1]:
+                    index.ends[-1] = e
+            else:
+                index.starts.append(s)
+                index.ends.append(e)
+        return index
+
+    @classmethod
+    def from_busy(cls, busy: Iterable[dict]) -> "AvailabilityIndex":
+        """Build from ``{"start": iso, "end": iso}`` dicts, skipping unparseable rows."""
+        pairs = []
+        for b in busy:
+            try:
+                pairs.append((to_epoch(parse_iso(b["start"])), to_epoch(parse_iso(b["end"]))))
+            except Exception:
+                continue
+        return cls.from_pairs(pairs)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def copy(self) -> "AvailabilityIndex":
+        index = AvailabilityIndex()
+        index.starts = array("q", self.starts)
+        index.ends = array("q", self.ends)
+        return index
+
+    def add(self, start: int, end: int) -> None:
+        """Mark [start, end) busy, merging with touching intervals."""
+        if end <= start:
+            return
+        lo = bisect_left(self.ends, start)
+        hi = bisect_right(self.starts, end)
+        if lo < hi:
+            start = min(start, self.starts[lo])
+            end = max(end, self.ends[hi - 1])
+        self.starts[lo:hi] = array("q", [start])
+        self.ends[lo:hi] = array("q", [end])
+
+    def subtract(self, start: int, end: int) -> None:
+        """Mark [start, end) free again, splitting intervals that straddle it."""
+        if end <= start:
+            return
+        lo = bisect_right(self.ends, start)
+        hi = bisect_left(self.starts, end)
+        if lo >= hi:
+            return
+        new_starts = array("q")
+        new_ends = array("q")
+        if self.starts[lo] < start:
+            new_starts.append(self.starts[lo])
+            new_ends.append(start)
+        if self.ends[hi - 1] > end:
+            new_starts.append(end)
+            new_ends.append(self.ends[hi - 1])
+        self.starts[lo:hi] = new_starts
+        self.ends[lo:hi] = new_ends
+
+    def is_free(self, start: int, end: int) -> bool:
+        i = bisect_right(self.ends, start)
+        return i >= len(self.starts) or self.starts[i] >= end
+
+    def fits(self, start: int, duration: int) -> bool:
+        return self.is_free(start, start + duration)
+
+    def busy_between(self, start: int, end: int) -> Iterator[tuple[int, int]]:
+        """Yield busy intervals clipped to [start, end)."""
+        i = bisect_right(self.ends, start)
+        while i < len(self.starts) and self.starts[i] < end:
+            yield max(self.starts[i], start), min(self.ends[i], end)
+            i += 1
+
+    def free_gaps(self, start: int, end: int) -> Iterator[tuple[int, int]]:
+        """Yield the free gaps inside [start, end)."""
+        cursor = start
+        for s, e in self.busy_between(start, end):
+            if s > cursor:
+                yield cursor, s
+            cursor = max(cursor, e)
+        if cursor < end:
+            yield cursor, end
+
+    def pack(self, start: int, end: int, duration: int) -> Iterator[tuple[int, int]]:
+        """Yield back-to-back free slots of ``duration`` seconds inside [start, end)."""
+        t = start
+        i = bisect_right(self.ends, t)
+        while t + duration <= end:
+            while i < len(self.starts) and self.ends[i] <= t:
+                i += 1
+            if i < len(self.starts) and self.starts[i] < t + duration:
+                t = self.ends[i]
+                continue
+            yield t, t + duration
+            t += duration
+
+
+def free_blocks(busy: list, start_dt: datetime, end_dt: datetime) -> list[dict]:
+    """Free ``{"start", "end"}`` ISO blocks in [start_dt, end_dt] around ``busy``."""
+    index = AvailabilityIndex.from_busy(busy)
+    tz = start_dt.tzinfo
+    return [
+        {"start": from_epoch(s, tz).isoformat(), "end": from_epoch(e, tz).isoformat()}
+        for s, e in index.free_gaps(to_epoch(start_dt), to_epoch(end_dt))
+    ]
@@ -0,0 +1,81 @@
+"""Keyset pagination and field projection shared by the list endpoints."""
+import base64
+import json
+from typing import Optional
+
+from fastapi import HTTPException, Response
+
+# Page size when the client doesn't ask for one, and the most it may ask for
+DEFAULT_PAGE_SIZE = 200
+MAX_PAGE_SIZE = 500
+
+
+def page_size(limit: Optional[int]) -> int:
+    if limit is None:
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def projection(fields: Optional[str], allowed: set[str]) -> Optional[list[str]]:
+    """Validated field list for ``fields=a,b,c``, or None for every field."""
+    if not fields:
+        return None
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = sorted(set(requested) - allowed)
+    if unknown:
+        raise HTTPException(400, f"Unknown fields: {', '.join(unknown)}")
+    return list(dict.fromkeys(requested))
+
+
+def select_columns(requested: list[str], always: tuple[str, ...], derived: dict[str, tuple[str, ...]]) -> str:
+    """PostgREST select for ``requested`` plus keyset columns and the inputs of derived fields."""
+    columns: list[str] = list(always)
+    for field in requested:
+        columns.extend(derived.get(field, (field,)))
+    return ",".join(dict.fromkeys(columns))
+
+
+def trim(rows: list[dict], requested: Optional[list[str]]) -> list[dict]:
+    """Drop the helper columns a projection didn't ask for."""
+    if requested is None:
+        return rows
+    return [{k: row.get(k) for k in requested} for row in rows]
+
+
+def encode_cursor(sort_value, row_id) -> str:
+    raw = json.dumps([sort_value, row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+    except Exception:
+        raise HTTPException(400, "Invalid cursor")
+    if not all(isinstance(v, str) and '"' not in v for v in (sort_value, row_id)):
+        raise HTTPException(400, "Invalid cursor")
+    return sort_value, row_id
+
+
+def after_cursor(q, cursor: Optional[str], column: str, desc: bool = False):
+    """Restrict ``q`` to rows strictly after ``cursor`` in (column, id) order."""
+    if not cursor:
+        return q
+    sort_value, row_id = decode_cursor(cursor)
+    op = "lt" if desc else "gt"
+    return q.or_(f'{column}.{op}."{sort_value}",and({column}.eq."{sort_value}",id.{op}."{row_id}")')
+
+
+def keyset_page(q, cursor: Optional[str], column: str, limit: int, response: Response, desc: bool = False) -> list[dict]:
+    """Run one page of ``q`` ordered by (column, id); sets X-Next-Cursor when more rows follow.
+
+    One extra row is fetched to tell whether another page exists.
+    """
+    q = after_cursor(q, cursor, column, desc)
+    rows = q.order(column, desc=desc).order("id", desc=desc).limit(limit + 1).execute().data or []
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last[column], last["id"])
+    return rows
@@ -1,16 +1,69 @@
+import hashlib
 import json
+import logging
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
-from api.calendar import get_busy
+from api.cache import TTLCache
+from api.calendar import get_busy_async
 from api.deps import get_current_user_id, get_supabase
+from api.estimator import estimate_locally, forget_index
+from api.gemini import gemini_client, response_text
+from api.intervals import free_blocks
+from api.plan_payload import (
+    COMPACT_BLOCK_SCHEMA,
+    COMPACT_PLAN_INSTRUCTIONS,
+    compact_task,
+    dedupe_preferences,
+    encode_free_blocks,
+    expand_block,
+    expand_plan,
+    user_tz,
+)
 from api.time_utils import parse_iso
 from config import settings
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+BLOCK_SCHEMA = "{start: string, end: string, duration_minutes: int, reason: string}"
+
+PLAN_SYSTEM_PROMPT = (
+    "You are a scheduling assistant. Use the user's task, preferences (both structured JSON and free-text), "
+    "and free time blocks to estimate total minutes and propose an efficient time-block plan. "
+    "Interpret free-text preferences creatively (e.g., 'no Fridays', 'prefer mornings', 'deep work before lunch'). "
+    "Respond with JSON only: "
+    "{total_estimated_minutes: int, blocks: [" + BLOCK_SCHEMA + "], notes: string}."
+)
+
+BATCH_SYSTEM_PROMPT = (
+    "You are a scheduling assistant. Plan every task in `tasks` using the user's preferences (both structured JSON "
+    "and free-text) and the shared free time blocks. Blocks for different tasks must not overlap. "
+    "Interpret free-text preferences creatively (e.g., 'no Fridays', 'prefer mornings', 'deep work before lunch'). "
+    "Respond with JSON only: "
+    "{plans: [{task_id: string, total_estimated_minutes: int, "
+    "blocks: [" + BLOCK_SCHEMA + "], notes: string}]}."
+)
+
+# Most tasks planned in one batch prompt
+PLAN_BATCH_LIMIT = 20
+
+TASK_PLAN_COLUMNS = "id,name,description,difficulty,focus_level,focus_minutes,time_preference,estimated_minutes"
+# Written back by the server after planning; kept out of the prompt so a
+# repeat request hashes to the same plan cache key
+SERVER_WRITTEN_TASK_FIELDS = ("estimated_minutes", "estimate_updated_at", "approved_minutes")
+
+# Default plan windows start at now floored to this, so repeat calls share a cache key
+PLAN_START_GRANULARITY = timedelta(minutes=5)
+
+# Gemini plans keyed by (user_id, hash of model and prompt payload), like the per-user plan_cache table
+_plan_cache = TTLCache(maxsize=settings.plan_cache_size, ttl=settings.plan_cache_ttl_seconds)
 
 
 class PlanRequest(BaseModel):
@@ -22,35 +75,19 @@ class PlanRequest(BaseModel):
     preferences_text: Optional[str] = None
     start: Optional[str] = None
     end: Optional[str] = None
+    # minute-offset prompt encoding; defaults to settings.plan_compact_payload
+    compact: Optional[bool] = None
+    # caller only needs estimated_minutes; lets the local estimator answer
+    estimate_only: bool = False
 
 
-def _merge_busy(busy: list) -> list[tuple[datetime, datetime]]:
-    intervals = sorted((parse_iso(b["start"]), parse_iso(b["end"])) for b in busy)
-    merged: list[tuple[datetime, datetime]] = []
-    for s, e in intervals:
-        if not merged or s > merged[-1][1]:
-            merged.append((s, e))
-        else:
-            last_s, last_e = merged[-1]
-            if e > last_e:
-                merged[-1] = (last_s, e)
-    return merged
-
-
-def _free_blocks_from_busy(busy: list, start_dt: datetime, end_dt: datetime) -> list[dict]:
-    if not busy:
-        return [{"start": start_dt.isoformat(), "end": end_dt.isoformat()}]
-    free: list[dict] = []
-    merged = _merge_busy(busy)
-    cursor = start_dt
-    for s, e in merged:
-        if s > cursor:
-            free.append({"start": cursor.isoformat(), "end": s.isoformat()})
-        if e > cursor:
-            cursor = e
-    if cursor < end_dt:
-        free.append({"start": cursor.isoformat(), "end": end_dt.isoformat()})
-    return free
+class BatchPlanRequest(BaseModel):
+    task_ids: list[str]
+    preferences: Optional[dict] = None
+    preferences_text: Optional[str] = None
+    start: Optional[str] = None
+    end: Optional[str] = None
+    compact: Optional[bool] = None
 
 
 def _coerce_minutes(value) -> Optional[int]:
@@ -65,32 +102,188 @@ def _coerce_minutes(value) -> Optional[int]:
     return minutes
 
 
-def _client():
-    if not settings.gemini_api_key:
-        raise HTTPException(500, "Gemini API key not configured")
+def _plan_cache_key(payload: dict, model_name: str) -> str:
+    blob = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(f"{model_name}\n{blob}".encode()).hexdigest()
+
+
+def _cached_plan(supabase, user_id: str, key: str) -> Optional[dict]:
+    plan = _plan_cache.get((user_id, key))
+    if plan is not None or not settings.plan_cache_persistent:
+        return plan
+    try:
+        r = (
+            supabase.table("plan_cache")
+            .select("plan,created_at")
+            .eq("user_id", user_id)
+            .eq("cache_key", key)
+            .execute()
+        )
+    except Exception:
+        # Table may not exist yet (migration 011)
+        return None
+    if not r.data:
+        return None
+    age = (datetime.now(timezone.utc) - parse_iso(r.data[0]["created_at"])).total_seconds()
+    if age > settings.plan_cache_ttl_seconds:
+        return None
+    plan = r.data[0]["plan"]
+    _plan_cache.set((user_id, key), plan, ttl=settings.plan_cache_ttl_seconds - age)
+    return plan
+
+
+def _store_plan(supabase, user_id: str, key: str, plan: dict) -> None:
+    _plan_cache.set((user_id, key), plan)
+    if not settings.plan_cache_persistent:
+        return
     try:
-        import google.generativeai as genai  # type: ignore
+        supabase.table("plan_cache").upsert(
+            {
+                "user_id": user_id,
+                "cache_key": key,
+                "plan": plan,
+                "created_at": datetime.now(timezone.utc).isoformat(),
+            },
+            on_conflict="user_id,cache_key",
+        ).execute()
     except Exception:
-        raise HTTPException(500, "Gemini SDK not installed. Run: pip install -r backend/requirements.txt")
-    genai.configure(api_key=settings.gemini_api_key)
-    model_name = settings.gemini_model or "gemini-1.5-pro"
-    return genai.GenerativeModel(model_name)
+        pass
 
 
-@router.post("")
-def plan_task(
-    body: PlanRequest,
-    user_id: str = Depends(get_current_user_id),
-    supabase=Depends(get_supabase),
-):
-    start_dt = parse_iso(body.start) if body.start else datetime.now(timezone.utc)
+def plan_cache_stats() -> dict:
+    return _plan_cache.stats()
+
+
+class _BlockScanner:
+    """Pull complete objects out of the ``blocks`` array of a JSON reply as it streams in."""
+
+    def __init__(self):
+        self.text = ""
+        self.pos = 0
+        self.in_array = False
+        self.done = False
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.obj_start = -1
+
+    def feed(self, chunk: str) -> list[dict]:
+        self.text += chunk
+        blocks = []
+        if not self.in_array and not self.done:
+            key = self.text.find('"blocks"')
+            bracket = self.text.find("[", key) if key >= 0 else -1
+            if bracket < 0:
+                return blocks
+            self.in_array = True
+            self.pos = bracket + 1
+        while self.in_array and self.pos < len(self.text):
+            ch = self.text[self.pos]
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == "\\":
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                self.in_string = True
+            elif ch == "{":
+                if self.depth == 0:
+                    self.obj_start = self.pos
+                self.depth += 1
+            elif ch == "}":
+                self.depth -= 1
+                if self.depth == 0:
+                    try:
+                        blocks.append(json.loads(self.text[self.obj_start:self.pos + 1]))
+                    except Exception:
+                        pass
+            elif ch == "]" and self.depth == 0:
+                self.in_array = False
+                self.done = True
+            self.pos += 1
+        return blocks
+
+
+def _parse_plan(content: str):
+    try:
+        return json.loads(content)
+    except Exception:
+        return {"raw": content}
+
+
+@dataclass
+class _PlanContext:
+    """Prompt and bookkeeping for one Gemini plan call."""
+
+    system: str
+    payload: dict
+    free_time_blocks: list[dict]
+    # Compact mode: block times are minute offsets from this instant
+    base: Optional[datetime] = None
+    task_record: Optional[dict] = None
+    tasks: dict[str, dict] = field(default_factory=dict)
+
+    def messages(self) -> list[dict]:
+        separators = (",", ":") if self.base else None
+        return [
+            {"role": "system", "parts": [self.system]},
+            {"role": "user", "parts": [json.dumps(self.payload, separators=separators)]},
+        ]
+
+    def cache_key(self) -> str:
+        return _plan_cache_key({"system": self.system, **self.payload}, settings.gemini_model or "gemini-1.5-pro")
+
+    def decode(self, plan):
+        return expand_plan(plan, self.base) if self.base else plan
+
+    def decode_block(self, block: dict) -> dict:
+        return expand_block(block, self.base) if self.base else block
+
+
+def _plan_window(body) -> tuple[datetime, datetime]:
+    if body.start:
+        start_dt = parse_iso(body.start)
+    else:
+        now = datetime.now(timezone.utc)
+        start_dt = now - (now - datetime.min.replace(tzinfo=timezone.utc)) % PLAN_START_GRANULARITY
     end_dt = parse_iso(body.end) if body.end else (start_dt + timedelta(days=7))
     max_end = start_dt + timedelta(days=7)
     if end_dt > max_end:
         end_dt = max_end
     if end_dt <= start_dt:
         raise HTTPException(400, "end must be after start")
+    return start_dt, end_dt
+
 
+def _load_tasks(supabase, user_id: str, task_ids: list[str]) -> list[dict]:
+    try:
+        task_r = (
+            supabase.table("tasks")
+            .select(TASK_PLAN_COLUMNS)
+            .in_("id", task_ids)
+            .eq("user_id", user_id)
+            .execute()
+        )
+    except Exception as e:
+        if "estimated_minutes" in str(e):
+            raise HTTPException(500, "DB migration missing: run 005_task_estimated_minutes.sql") from e
+        raise
+    return task_r.data or []
+
+
+def _use_compact(body) -> bool:
+    return settings.plan_compact_payload if body.compact is None else body.compact
+
+
+def _system_prompt(prompt: str, compact: bool) -> str:
+    if not compact:
+        return prompt
+    return prompt.replace(BLOCK_SCHEMA, COMPACT_BLOCK_SCHEMA) + " " + COMPACT_PLAN_INSTRUCTIONS
+
+
+def _load_profile(supabase, user_id: str) -> dict:
     profile_r = (
         supabase.table("user_profiles")
         .select("*")
@@ -98,24 +291,17 @@ def plan_task(
         .single()
         .execute()
     )
-    profile = profile_r.data or {}
-    task_record = None
-    if body.task_id:
-        try:
-            task_r = (
-                supabase.table("tasks")
-                .select("id,name,description,difficulty,focus_level,time_preference,estimated_minutes")
-                .eq("id", body.task_id)
-                .eq("user_id", user_id)
-                .execute()
-            )
-        except Exception as e:
-            if "estimated_minutes" in str(e):
-                raise HTTPException(500, "DB migration missing: run 004_task_estimated_minutes.sql") from e
-            raise
-        if not task_r.data:
-            raise HTTPException(404, "Task not found")
-        task_record = task_r.data[0]
+    return profile_r.data or {}
+
+
+async def _shared_context(body, user_id: str, supabase) -> tuple[dict, list[dict], Optional[datetime]]:
+    """Preferences, profile and free blocks common to single and batch prompts.
+
+    Returns (payload fields, free_time_blocks, base); ``base`` is only set in
+    compact mode.
+    """
+    start_dt, end_dt = _plan_window(body)
+    profile = await run_in_threadpool(_load_profile, supabase, user_id)
     prefs_structured = (
         body.preferences
         if body.preferences is not None
@@ -129,57 +315,255 @@ def plan_task(
         or ""
     )
 
-    busy = get_busy(user_id, supabase, start_dt.isoformat(), end_dt.isoformat())
-    free_blocks = _free_blocks_from_busy(busy, start_dt, end_dt)
+    busy = await get_busy_async(user_id, supabase, start_dt.isoformat(), end_dt.isoformat())
+    free_time_blocks = free_blocks(busy, start_dt, end_dt)
+
+    if _use_compact(body):
+        tz = user_tz(profile.get("timezone"))
+        base = start_dt.astimezone(tz)
+        shared = {
+            **dedupe_preferences(prefs_structured, prefs_text),
+            "timezone": str(tz),
+            "base": base.isoformat(),
+            "free": encode_free_blocks(
+                free_time_blocks, base, settings.plan_min_free_minutes, settings.plan_merge_gap_minutes
+            ),
+        }
+        return shared, free_time_blocks, base
 
-    payload = {
-        "task": body.task,
-        "task_record": task_record,
+    shared = {
         "preferences_structured": prefs_structured,
         "preferences_text": prefs_text,
         "user_profile": {
             "display_name": profile.get("display_name"),
             "timezone": profile.get("timezone") or "UTC",
         },
-        "free_time_blocks": free_blocks,
+        "free_time_blocks": free_time_blocks,
     }
+    return shared, free_time_blocks, None
+
+
+def _prompt_task(task_record: Optional[dict], compact: bool) -> Optional[dict]:
+    if task_record is None:
+        return None
+    task = {k: v for k, v in task_record.items() if k not in SERVER_WRITTEN_TASK_FIELDS}
+    return compact_task(task) if compact else task
+
 
-    system = (
-        "You are a scheduling assistant. Use the user's task, preferences (both structured JSON and free-text), "
-        "and free time blocks to estimate total minutes and propose an efficient time-block plan. "
-        "Interpret free-text preferences creatively (e.g., 'no Fridays', 'prefer mornings', 'deep work before lunch'). "
-        "Respond with JSON only: "
-        "{total_estimated_minutes: int, blocks: [{start: string, end: string, duration_minutes: int, reason: string}], notes: string}."
+async def _plan_context(body: PlanRequest, user_id: str, supabase) -> _PlanContext:
+    """Load everything the prompt needs."""
+    task_record = None
+    if body.task_id:
+        tasks = await run_in_threadpool(_load_tasks, supabase, user_id, [body.task_id])
+        if not tasks:
+            raise HTTPException(404, "Task not found")
+        task_record = tasks[0]
+    shared, free_time_blocks, base = await _shared_context(body, user_id, supabase)
+    task = _prompt_task(task_record, base is not None)
+    return _PlanContext(
+        system=_system_prompt(PLAN_SYSTEM_PROMPT, base is not None),
+        payload={"task": body.task, "task_record": task, **shared},
+        free_time_blocks=free_time_blocks,
+        base=base,
+        task_record=task_record,
     )
 
-    client = _client()
-    try:
-        resp = client.generate_content(
-            [
-                {"role": "system", "parts": [system]},
-                {"role": "user", "parts": [json.dumps(payload)]},
-            ],
-            generation_config={"temperature": 0.2},
-        )
-    except Exception as e:
-        raise HTTPException(500, f"Gemini request failed: {e}") from e
 
-    content = getattr(resp, "text", "") or ""
-    try:
-        plan = json.loads(content)
-    except Exception:
-        plan = {"raw": content}
+def _save_estimate(supabase, user_id: str, task_id: Optional[str], task_record: Optional[dict], plan) -> Optional[int]:
+    """Write the plan's total to tasks.estimated_minutes when it changed."""
+    if not isinstance(plan, dict):
+        return None
+    estimated_minutes = _coerce_minutes(plan.get("total_estimated_minutes"))
+    current = (task_record or {}).get("estimated_minutes")
+    if estimated_minutes is not None and task_id and estimated_minutes != current:
+        supabase.table("tasks").update(
+            {"estimated_minutes": estimated_minutes}
+        ).eq("id", task_id).eq("user_id", user_id).execute()
+        forget_index(user_id)
+    return estimated_minutes
+
+
+def _cacheable(plan) -> bool:
+    return isinstance(plan, dict) and "raw" not in plan
+
+
+def _local_estimate(body: PlanRequest, user_id: str, supabase) -> Optional[dict]:
+    """Answer an estimate_only request from the user's past tasks, or None to ask Gemini."""
+    tasks = _load_tasks(supabase, user_id, [body.task_id])
+    if not tasks:
+        raise HTTPException(404, "Task not found")
+    task_record = tasks[0]
+    local = estimate_locally(supabase, user_id, task_record)
+    if local is None:
+        return None
+    minutes, confidence = local
+    _save_estimate(supabase, user_id, body.task_id, task_record, {"total_estimated_minutes": minutes})
+    return {
+        "plan": None,
+        "free_time_blocks": [],
+        "estimated_minutes": minutes,
+        "cached": False,
+        "source": "local",
+        "confidence": round(confidence, 3),
+    }
+
+
+@router.post("")
+async def plan_task(
+    body: PlanRequest,
+    user_id: str = Depends(get_current_user_id),
+    supabase=Depends(get_supabase),
+):
+    """Estimate and plan a task with Gemini.
 
-    estimated_minutes = None
-    if isinstance(plan, dict):
-        estimated_minutes = _coerce_minutes(plan.get("total_estimated_minutes"))
-        if estimated_minutes is not None and body.task_id:
-            supabase.table("tasks").update(
-                {"estimated_minutes": estimated_minutes}
-            ).eq("id", body.task_id).eq("user_id", user_id).execute()
+    ``source`` in the response says what answered: ``local`` (estimate_only
+    requests the estimator was confident about), ``cache`` or ``gemini``.
+    """
+    if body.estimate_only and body.task_id and settings.local_estimator:
+        local = await run_in_threadpool(_local_estimate, body, user_id, supabase)
+        if local is not None:
+            return local
+    ctx = await _plan_context(body, user_id, supabase)
+    cache_key = ctx.cache_key()
+    plan = await run_in_threadpool(_cached_plan, supabase, user_id, cache_key)
+    cached = plan is not None
+    if not cached:
+        resp = await gemini_client.generate(ctx.messages(), generation_config={"temperature": 0.2}, label="plan")
+        plan = ctx.decode(_parse_plan(response_text(resp)))
+        if _cacheable(plan):
+            await run_in_threadpool(_store_plan, supabase, user_id, cache_key, plan)
 
+    estimated_minutes = await run_in_threadpool(_save_estimate, supabase, user_id, body.task_id, ctx.task_record, plan)
     return {
         "plan": plan,
-        "free_time_blocks": free_blocks,
+        "free_time_blocks": ctx.free_time_blocks,
+        "estimated_minutes": estimated_minutes,
+        "cached": cached,
+        "source": "cache" if cached else "gemini",
+    }
+
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.post("/stream")
+async def plan_task_stream(
+    body: PlanRequest,
+    user_id: str = Depends(get_current_user_id),
+    supabase=Depends(get_supabase),
+):
+    """Same as POST /api/plan, streamed as Server-Sent Events.
+
+    Emits ``block`` events as each plan block arrives from Gemini, then one
+    ``plan`` event with the body POST /api/plan would have returned.
+    """
+    ctx = await _plan_context(body, user_id, supabase)
+    cache_key = ctx.cache_key()
+    cached_plan = await run_in_threadpool(_cached_plan, supabase, user_id, cache_key)
+    if cached_plan is None:
+        # Fail before the stream starts when Gemini is not configured
+        gemini_client.model()
+
+    async def events():
+        plan = cached_plan
+        if plan is not None:
+            for block in plan.get("blocks") or []:
+                yield _sse("block", block)
+        else:
+            scanner = _BlockScanner()
+            try:
+                async for text in gemini_client.stream(ctx.messages(), generation_config={"temperature": 0.2}, label="plan stream"):
+                    for block in scanner.feed(text):
+                        yield _sse("block", ctx.decode_block(block))
+            except HTTPException as e:
+                logger.warning("Gemini stream failed for %s: %s", user_id, e.detail)
+                yield _sse("error", {"detail": e.detail})
+                return
+            plan = ctx.decode(_parse_plan(scanner.text))
+            if _cacheable(plan):
+                await run_in_threadpool(_store_plan, supabase, user_id, cache_key, plan)
+        estimated_minutes = await run_in_threadpool(_save_estimate, supabase, user_id, body.task_id, ctx.task_record, plan)
+        yield _sse(
+            "plan",
+            {
+                "plan": plan,
+                "free_time_blocks": ctx.free_time_blocks,
+                "estimated_minutes": estimated_minutes,
+                "cached": cached_plan is not None,
+                "source": "gemini" if cached_plan is None else "cache",
+            },
+        )
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _batch_context(body: BatchPlanRequest, user_id: str, supabase) -> _PlanContext:
+    tasks = await run_in_threadpool(_load_tasks, supabase, user_id, body.task_ids)
+    by_id = {t["id"]: t for t in tasks}
+    missing = [tid for tid in body.task_ids if tid not in by_id]
+    if missing:
+        raise HTTPException(404, f"Task not found: {', '.join(missing)}")
+    shared, free_time_blocks, base = await _shared_context(body, user_id, supabase)
+    records = [by_id[tid] for tid in body.task_ids]
+    return _PlanContext(
+        system=_system_prompt(BATCH_SYSTEM_PROMPT, base is not None),
+        payload={"tasks": [_prompt_task(t, base is not None) for t in records], **shared},
+        free_time_blocks=free_time_blocks,
+        base=base,
+        tasks=by_id,
+    )
+
+
+def _save_estimates(supabase, user_id: str, by_id: dict[str, dict], plans: dict[str, dict]) -> dict[str, Optional[int]]:
+    return {
+        task_id: _save_estimate(supabase, user_id, task_id, by_id[task_id], plan)
+        for task_id, plan in plans.items()
+    }
+
+
+@router.post("/batch")
+async def plan_tasks_batch(
+    body: BatchPlanRequest,
+    user_id: str = Depends(get_current_user_id),
+    supabase=Depends(get_supabase),
+):
+    """Plan several tasks with one Gemini call; blocks do not overlap across tasks."""
+    task_ids = list(dict.fromkeys(body.task_ids))
+    if not task_ids:
+        raise HTTPException(400, "task_ids is required")
+    if len(task_ids) > PLAN_BATCH_LIMIT:
+        raise HTTPException(400, f"At most {PLAN_BATCH_LIMIT} tasks per batch")
+    body = body.model_copy(update={"task_ids": task_ids})
+    ctx = await _batch_context(body, user_id, supabase)
+    cache_key = ctx.cache_key()
+    result = await run_in_threadpool(_cached_plan, supabase, user_id, cache_key)
+    cached = result is not None
+    if not cached:
+        resp = await gemini_client.generate(ctx.messages(), generation_config={"temperature": 0.2}, label="plan batch")
+        result = _parse_plan(response_text(resp))
+        if isinstance(result, dict) and isinstance(result.get("plans"), list):
+            result = {**result, "plans": [ctx.decode(p) for p in result["plans"]]}
+        if _cacheable(result):
+            await run_in_threadpool(_store_plan, supabase, user_id, cache_key, result)
+
+    plans = {}
+    if isinstance(result, dict):
+        for plan in result.get("plans") or []:
+            if isinstance(plan, dict) and plan.get("task_id") in ctx.tasks:
+                plans[plan["task_id"]] = plan
+    estimated_minutes = await run_in_threadpool(_save_estimates, supabase, user_id, ctx.tasks, plans)
+    response = {
+        "plans": plans,
+        "free_time_blocks": ctx.free_time_blocks,
         "estimated_minutes": estimated_minutes,
+        "cached": cached,
+        "source": "cache" if cached else "gemini",
     }
+    if not plans:
+        response["raw"] = result
+    return response
@@ -0,0 +1,99 @@
+"""Compact prompt encoding for /api/plan: minute offsets instead of ISO strings."""
+import json
+import math
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+from api.time_utils import parse_iso
+
+COMPACT_PLAN_INSTRUCTIONS = (
+    "Times are whole minutes from `base` (the user's local time in `timezone`); "
+    "`free` lists [start, end) minute ranges of free time. "
+    "Answer with block start/end as minute offsets from `base`."
+)
+COMPACT_BLOCK_SCHEMA = "{start: int, end: int, reason: string}"
+
+
+def user_tz(name: Optional[str]) -> tzinfo:
+    try:
+        return ZoneInfo(name) if name else timezone.utc
+    except Exception:
+        return timezone.utc
+
+
+def encode_free_blocks(
+    free_blocks: list[dict], base: datetime, min_minutes: int, merge_gap_minutes: int = 0
+) -> list[list[int]]:
+    """[[start, end], ...] minute offsets from ``base``.
+
+    Ends are floored and starts ceiled to whole minutes, blocks that then
+    touch or are less than ``merge_gap_minutes`` apart are merged, and blocks
+    shorter than ``min_minutes`` are dropped.
+    """
+    merged: list[list[int]] = []
+    for b in sorted(free_blocks, key=lambda b: parse_iso(b["start"])):
+        start = math.ceil((parse_iso(b["start"]) - base).total_seconds() / 60)
+        end = math.floor((parse_iso(b["end"]) - base).total_seconds() / 60)
+        if end <= start:
+            continue
+        if merged and start - merged[-1][1] < max(merge_gap_minutes, 1):
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [pair for pair in merged if pair[1] - pair[0] >= min_minutes]
+
+
+def _prune(value):
+    if isinstance(value, dict):
+        pruned = {k: _prune(v) for k, v in value.items()}
+        return {k: v for k, v in pruned.items() if v not in (None, "", [], {})}
+    if isinstance(value, list):
+        return [v for v in (_prune(v) for v in value) if v not in (None, "", [], {})]
+    return value
+
+
+def dedupe_preferences(structured: Optional[dict], text: str) -> dict:
+    """Drop empty legacy preferences and ones already carried by ``text``.
+
+    Migration 003 copied the legacy JSON into preferences_text verbatim, so
+    for many users both fields say the same thing.
+    """
+    out: dict = {}
+    text = (text or "").strip()
+    structured = _prune(structured or {})
+    if structured:
+        try:
+            duplicate = _prune(json.loads(text)) == structured
+        except Exception:
+            duplicate = False
+        if not duplicate:
+            out["preferences"] = structured
+    if text:
+        out["preferences_text"] = text
+    return out
+
+
+def compact_task(task_record: Optional[dict]) -> Optional[dict]:
+    return _prune(task_record) if task_record else task_record
+
+
+def expand_block(block: dict, base: datetime) -> dict:
+    """Turn a minute-offset block from the model back into ISO start/end."""
+    try:
+        start = base + timedelta(minutes=float(block["start"]))
+        end = base + timedelta(minutes=float(block["end"]))
+    except Exception:
+        return block
+    return {
+        **block,
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "duration_minutes": round((end - start).total_seconds() / 60),
+    }
+
+
+def expand_plan(plan, base: datetime):
+    if isinstance(plan, dict) and isinstance(plan.get("blocks"), list):
+        return {**plan, "blocks": [expand_block(b, base) if isinstance(b, dict) else b for b in plan["blocks"]]}
+    return plan
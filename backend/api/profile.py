@@ -1,9 +1,10 @@
 from datetime import datetime
 from typing import Optional, Dict, Any
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 from pydantic import BaseModel
 
 from api.deps import get_current_user_id, get_supabase
+from api.etag import etag, not_modified
 
 router = APIRouter()
 
@@ -19,6 +20,8 @@ class ProfileUpdate(BaseModel):
 
 @router.get("")
 def get_profile(
+    request: Request,
+    response: Response,
     user_id: str = Depends(get_current_user_id),
     supabase=Depends(get_supabase),
 ):
@@ -41,6 +44,12 @@ def get_profile(
     )
     calendar_connected = bool(cal_r.data)
 
+    # upsert_profile stamps updated_at on every write
+    tag = etag("profile", user_id, profile.get("updated_at") if profile else None, calendar_connected)
+    unchanged = not_modified(request, response, tag)
+    if unchanged:
+        return unchanged
+
     if profile:
         if calendar_connected:
             profile["timezone"] = None  # ignore stored timezone if calendar is connected
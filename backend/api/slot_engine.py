@@ -0,0 +1,116 @@
+"""Vectorized candidate-slot generation and scoring for suggestions."""
+from datetime import datetime, tzinfo
+
+import numpy as np
+
+from api.intervals import AvailabilityIndex
+
+# Candidate starts are laid on a grid of this many seconds (plus every busy end).
+GRID_STEP_SECONDS = 300
+
+
+def _utc_offsets(epochs: np.ndarray, tz: tzinfo) -> np.ndarray:
+    """UTC offset in seconds for each epoch, looked up once per distinct hour."""
+    hours, inverse = np.unique(epochs // 3600, return_inverse=True)
+    offsets = np.fromiter(
+        (datetime.fromtimestamp(int(h) * 3600, tz).utcoffset().total_seconds() for h in hours),
+        dtype=np.int64,
+        count=len(hours),
+    )
+    return offsets[inverse]
+
+
+def _in_hours(local_hour: np.ndarray, h_start: int, h_end: int) -> np.ndarray:
+    if h_end > 24:
+        # window wraps past midnight, e.g. 20 -> 29 == 20:00-05:00
+        return (local_hour >= h_start) | (local_hour < h_end - 24)
+    return (local_hour >= h_start) & (local_hour < h_end)
+
+
+def rank_candidates(
+    busy: AvailabilityIndex,
+    range_start: int,
+    range_end: int,
+    duration: int,
+    tz: tzinfo,
+    pref_hours: tuple[int, int],
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return (starts, local_days, scores) for every free, in-preference candidate.
+
+    Candidates are grid points across [range_start, range_end] plus busy ends,
+    kept when [start, start + duration) misses every busy interval and both
+    ends fall inside ``pref_hours`` in ``tz``. Scores favour earlier starts,
+    then closeness to the preference window's centre.
+    """
+    last_start = range_end - duration
+    if last_start < range_start:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, np.empty(0, dtype=np.float64)
+    # Copy out of the array('q') buffers so the index stays resizable.
+    busy_starts = np.frombuffer(busy.starts, dtype=np.int64).copy() if len(busy) else np.empty(0, dtype=np.int64)
+    busy_ends = np.frombuffer(busy.ends, dtype=np.int64).copy() if len(busy) else np.empty(0, dtype=np.int64)
+
+    grid = np.arange(range_start, last_start + 1, GRID_STEP_SECONDS, dtype=np.int64)
+    after_busy = busy_ends[(busy_ends >= range_start) & (busy_ends <= last_start)]
+    starts = np.union1d(grid, after_busy)
+
+    if len(busy_starts):
+        nxt = np.searchsorted(busy_ends, starts, side="right")
+        has_next = nxt < len(busy_starts)
+        clash = np.zeros(len(starts), dtype=bool)
+        clash[has_next] = busy_starts[nxt[has_next]] < starts[has_next] + duration
+        starts = starts[~clash]
+
+    ends = starts + duration
+    local_starts = starts + _utc_offsets(starts, tz)
+    local_ends = ends + _utc_offsets(ends, tz)
+    h_start, h_end = pref_hours
+    in_pref = _in_hours((local_starts // 3600) % 24, h_start, h_end) & _in_hours(
+        (local_ends // 3600) % 24, h_start, h_end
+    )
+    starts = starts[in_pref]
+    local_starts = local_starts[in_pref]
+
+    pref_center = ((h_start + h_end) / 2) * 60
+    time_of_day = (local_starts // 60) % 1440
+    scores = -((starts - range_start) / 60.0) - 0.1 * np.abs(time_of_day - pref_center)
+    return starts, local_starts // 86400, scores
+
+
+def pick_spread(
+    starts: np.ndarray,
+    days: np.ndarray,
+    scores: np.ndarray,
+    duration: int,
+    limit: int,
+    taken: AvailabilityIndex,
+) -> list[tuple[int, int]]:
+    """Pick up to ``limit`` non-overlapping slots, round-robin across days by score.
+
+    Picks are added to ``taken`` so callers can share it across tasks.
+    """
+    if not len(starts) or limit <= 0:
+        return []
+    order = np.lexsort((-scores, days))
+    starts = starts[order]
+    days = days[order]
+    bounds = np.flatnonzero(np.diff(days)) + 1
+    buckets = np.split(starts, bounds)
+    positions = [0] * len(buckets)
+    picks: list[tuple[int, int]] = []
+    while len(picks) < limit:
+        progressed = False
+        for i, bucket in enumerate(buckets):
+            if len(picks) >= limit:
+                break
+            while positions[i] < len(bucket):
+                s = int(bucket[positions[i]])
+                positions[i] += 1
+                if taken.is_free(s, s + duration):
+                    taken.add(s, s + duration)
+                    picks.append((s, s + duration))
+                    progressed = True
+                    break
+        if not progressed:
+            break
+    return picks
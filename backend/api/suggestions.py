@@ -3,12 +3,18 @@ from typing import Optional
 from datetime import datetime, timedelta, timezone
 from zoneinfo import ZoneInfo
 import math
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 
 from api.deps import get_current_user_id, get_supabase
-from api.time_utils import clamp_range, parse_iso
-from api.calendar import get_calendar_service, get_busy
+from api.tasks import _approved_minutes
+from api.time_utils import clamp_range
+from api.calendar import calendar_changed, get_calendar_service, get_busy_async, insert_events
+from api.etag import etag, not_modified, table_version
+from api.intervals import AvailabilityIndex, from_epoch, to_epoch
+from api.listing import keyset_page, page_size, projection, select_columns, trim
+from api.slot_engine import pick_spread, rank_candidates
 
 router = APIRouter()
 
@@ -32,30 +38,13 @@ def _focus_minutes(value) -> int:
         return FOCUS_MINUTES.get(str(value), 50)
 # Cap pending suggestions per user to keep UI manageable
 MAX_SUGGESTIONS = 15
-
-
-def slots_from_busy(busy: list, start_dt: datetime, end_dt: datetime, duration_min: int):
-    """Chop [start_dt, end_dt] into free slots of at least duration_min, avoiding busy."""
-    free_slots = []
-    busy_sorted = sorted(
-        (parse_iso(b["start"]), parse_iso(b["end"])) for b in busy
-    )
-    t = start_dt
-    bi = 0
-    while t < end_dt:
-        slot_end = t + timedelta(minutes=duration_min)
-        if slot_end > end_dt:
-            break
-        # skip past any busy that ends before t
-        while bi < len(busy_sorted) and busy_sorted[bi][1] <= t:
-            bi += 1
-        # if next busy starts before our slot ends, we can't use this slot
-        if bi < len(busy_sorted) and busy_sorted[bi][0] < slot_end:
-            t = busy_sorted[bi][1]
-            continue
-        free_slots.append((t.isoformat(), slot_end.isoformat()))
-        t = slot_end
-    return free_slots
+# Longest range (days) a suggestion run may search
+MAX_HORIZON_DAYS = 90
+SUGGESTION_STATUSES = ("pending", "approved", "rejected")
+# Fields a suggestion listing may project with ?fields=
+SUGGESTION_FIELDS = {"id", "task_id", "start_time", "end_time", "status", "created_at", "task_name"}
+# task_name comes from the embedded task row, in the same request
+SUGGESTION_DERIVED_FIELDS = {"task_name": ("task:tasks(name)",)}
 
 
 def _coerce_minutes(value) -> Optional[int]:
@@ -70,31 +59,6 @@ def _coerce_minutes(value) -> Optional[int]:
     return minutes
 
 
-def _minutes_between(start: str, end: str) -> int:
-    try:
-        s = parse_iso(start)
-        e = parse_iso(end)
-    except Exception:
-        return 0
-    delta = e - s
-    return max(0, int(round(delta.total_seconds() / 60.0)))
-
-
-def _approved_minutes_for_task(supabase, task_id: str, user_id: str) -> int:
-    res = (
-        supabase.table("suggested_slots")
-        .select("start_time,end_time")
-        .eq("task_id", task_id)
-        .eq("user_id", user_id)
-        .eq("status", "approved")
-        .execute()
-    )
-    total = 0
-    for row in res.data or []:
-        total += _minutes_between(row.get("start_time"), row.get("end_time"))
-    return total
-
-
 def _task_complete(task: dict, approved_minutes: int) -> bool:
     estimated = _coerce_minutes(task.get("estimated_minutes"))
     if estimated is None:
@@ -115,25 +79,65 @@ def _desired_limit_for_task(task: dict, approved_minutes: int, requested_limit:
     return max(base, min(20, needed))
 
 
-def _score_slot(slot_start: datetime, range_start: datetime, pref_center_minutes: int) -> float:
-    minutes_from_start = (slot_start - range_start).total_seconds() / 60.0
-    time_of_day = slot_start.hour * 60 + slot_start.minute
-    pref_distance = abs(time_of_day - pref_center_minutes)
-    # Prefer earlier times to reduce procrastination, then closer to preference center.
-    return (-minutes_from_start) - (0.1 * pref_distance)
+def _pref_window_count(start_dt: datetime, end_dt: datetime, pref: str) -> int:
+    """Per-day preference windows (two for the wrapping night window) in the range."""
+    days = (end_dt.date() - start_dt.date()).days + 1
+    return days * 2 if PREF_HOURS.get(pref, (11, 20))[1] > 24 else days
+
 
+def _existing_busy(supabase, user_id: str, start_dt: datetime, end_dt: datetime, replacing_task_id: Optional[str] = None) -> list[dict]:
+    """Existing pending/approved suggestions in range, as busy intervals.
 
-def _within_pref_window(dt: datetime, pref: str) -> bool:
-    h = dt.hour
-    if pref == "day":
-        return 5 <= h < 11  # Morning
-    if pref == "midday":
-        return 11 <= h < 20  # Midday
-    # night window wraps: 20:00–24:00 and 00:00–05:00
-    return h >= 20 or h < 5
+    Pending rows of ``replacing_task_id`` are about to be replaced, so they don't count.
+    """
+    res = (
+        supabase.table("suggested_slots")
+        .select("task_id,status,start_time,end_time")
+        .eq("user_id", user_id)
+        .in_("status", ["pending", "approved"])
+        .gte("start_time", start_dt.isoformat())
+        .lte("end_time", end_dt.isoformat())
+        .execute()
+    )
+    return [
+        {"start": row["start_time"], "end": row["end_time"]}
+        for row in (res.data or [])
+        if not (row["status"] == "pending" and row["task_id"] == replacing_task_id)
+    ]
 
 
-def _generate_suggestions_for_task(
+def _pick_slots_for_task(
+    task: dict,
+    busy_index: AvailabilityIndex,
+    start_dt: datetime,
+    end_dt: datetime,
+    limit: int,
+    tz: timezone,
+) -> list[dict]:
+    """Pick up to ``limit`` slots for the task and mark them busy in ``busy_index``."""
+    duration = _focus_minutes(task.get("focus_minutes") or task.get("focus_level")) * 60
+    pref = task.get("time_preference", "midday")
+    starts, days, scores = rank_candidates(
+        busy_index,
+        to_epoch(start_dt),
+        to_epoch(end_dt),
+        duration,
+        tz,
+        PREF_HOURS.get(pref, (11, 20)),
+    )
+    # Spread picks across days to avoid clustering
+    picks = pick_spread(starts, days, scores, duration, limit, busy_index)
+    range_tz = start_dt.tzinfo or timezone.utc
+    return [
+        {
+            "start_time": from_epoch(slot_s, range_tz).isoformat(),
+            "end_time": from_epoch(slot_e, range_tz).isoformat(),
+        }
+        for slot_s, slot_e in picks
+    ]
+
+
+async def _generate_suggestions_for_task(
     task: dict,
     user_id: str,
     supabase,
@@ -141,130 +145,104 @@ def _generate_suggestions_for_task(
     end_dt: datetime,
     limit: int,
     tz: timezone,
+    stats: Optional[dict] = None,
 ):
-    duration_min = _focus_minutes(task.get("focus_minutes") or task.get("focus_level"))
-    pref = task.get("time_preference", "midday")
-    h_start, h_end = PREF_HOURS.get(pref, (11, 20))
-    pref_center_minutes = int(((h_start + h_end) / 2) * 60)
-
-    # Narrow to preferred hours on each day (local hours)
-    candidates = []
-    d = start_dt.date()
-    while d <= end_dt.date():
-        # handle night window that wraps past midnight (e.g., 20 -> 29 == 5 next day)
-        if h_end > 24:
-            first_end = datetime(d.year, d.month, d.day, 23, 59, 59, tzinfo=start_dt.tzinfo)
-            day_start = datetime(d.year, d.month, d.day, h_start, 0, 0, tzinfo=start_dt.tzinfo)
-            if day_start < start_dt:
-                day_start = start_dt
-            if day_start < first_end:
-                candidates.append((day_start, first_end))
-            next_day = d + timedelta(days=1)
-            wrap_end = datetime(next_day.year, next_day.month, next_day.day, (h_end - 24), 0, 0, tzinfo=start_dt.tzinfo)
-            wrap_start = datetime(next_day.year, next_day.month, next_day.day, 0, 0, 0, tzinfo=start_dt.tzinfo)
-            if wrap_start < start_dt:
-                wrap_start = start_dt
-            if wrap_end > end_dt:
-                wrap_end = end_dt
-            if wrap_start < wrap_end:
-                candidates.append((wrap_start, wrap_end))
-        else:
-            day_start = datetime(d.year, d.month, d.day, h_start, 0, 0, tzinfo=start_dt.tzinfo)
-            day_end = datetime(d.year, d.month, d.day, h_end, 0, 0, tzinfo=start_dt.tzinfo)
-            if day_start < start_dt:
-                day_start = start_dt
-            if day_end > end_dt:
-                day_end = end_dt
-            if day_start < day_end:
-                candidates.append((day_start, day_end))
-        d += timedelta(days=1)
-
-    # Clear any pending suggestions for this task to avoid duplicates/clutter
-    supabase.table("suggested_slots").delete().eq("task_id", task["id"]).eq("user_id", user_id).eq("status", "pending").execute()
-
-    # Treat existing suggestions (pending/approved) as busy so we don't stack on top
-    existing_busy = []
-    for status in ("pending", "approved"):
-        res = (
+    """Rank free slots in the task's preferred hours and store the top picks as pending.
+
+    Calendar busy time is fetched once for [start_dt, end_dt]; ``stats`` (if
+    given) records how many free/busy round-trips that saved compared to one
+    fetch per preference window.
+    """
+    existing_busy = await run_in_threadpool(_existing_busy, supabase, user_id, start_dt, end_dt, task["id"])
+    # One free/busy fetch for the whole range; each preference window queries it in memory.
+    calendar_busy = await get_busy_async(user_id, supabase, start_dt.isoformat(), end_dt.isoformat(), max_days=MAX_HORIZON_DAYS)
+    if stats is not None:
+        windows = _pref_window_count(start_dt, end_dt, task.get("time_preference", "midday"))
+        stats["busy_fetches"] = stats.get("busy_fetches", 0) + 1
+        stats["busy_calls_saved"] = stats.get("busy_calls_saved", 0) + max(0, windows - 1)
+
+    busy_index = AvailabilityIndex.from_busy(calendar_busy + existing_busy)
+    slots = _pick_slots_for_task(task, busy_index, start_dt, end_dt, limit, tz)
+    return await run_in_threadpool(_replace_pending, supabase, user_id, task["id"], slots)
+
+
+async def _schedule_tasks_jointly(
+    tasks: list[dict],
+    user_id: str,
+    supabase,
+    start_dt: datetime,
+    end_dt: datetime,
+    limit: int,
+    remaining: int,
+    tz: timezone,
+    stats: Optional[dict] = None,
+) -> list[dict]:
+    """Suggest slots for several tasks in one pass over a shared availability index.
+
+    Busy time, existing suggestions and approved totals are loaded once; each
+    task's picks are marked busy before the next task is scheduled, so picks
+    never overlap. Expects the tasks' pending rows to be cleared already.
+    """
+    if not tasks:
+        return []
+    calendar_busy = await get_busy_async(user_id, supabase, start_dt.isoformat(), end_dt.isoformat(), max_days=MAX_HORIZON_DAYS)
+    existing_busy = await run_in_threadpool(_existing_busy, supabase, user_id, start_dt, end_dt)
+    busy_index = AvailabilityIndex.from_busy(calendar_busy + existing_busy)
+    rows: list[dict] = []
+    windows = 0
+    for task in tasks:
+        if remaining <= 0:
+            break
+        approved_minutes = _approved_minutes(task)
+        if _task_complete(task, approved_minutes):
+            continue
+        take = min(_desired_limit_for_task(task, approved_minutes, limit), remaining)
+        windows += _pref_window_count(start_dt, end_dt, task.get("time_preference", "midday"))
+        for slot in _pick_slots_for_task(task, busy_index, start_dt, end_dt, take, tz):
+            rows.append({**slot, "task_id": task["id"], "user_id": user_id, "status": "pending"})
+            remaining -= 1
+    if stats is not None:
+        stats["busy_fetches"] = stats.get("busy_fetches", 0) + 1
+        stats["busy_calls_saved"] = stats.get("busy_calls_saved", 0) + max(0, windows - 1)
+    if not rows:
+        return []
+    r = await run_in_threadpool(supabase.table("suggested_slots").insert(rows).execute)
+    return r.data or []
+
+
+def _replace_pending(supabase, user_id: str, task_id: str, slots: list[dict]) -> list[dict]:
+    """Swap the task's pending suggestions for ``slots`` without an empty window."""
+    try:
+        r = supabase.rpc(
+            "replace_pending_suggestions",
+            {"p_user_id": user_id, "p_task_id": task_id, "p_slots": slots},
+        ).execute()
+        return r.data or []
+    except Exception as e:
+        if "replace_pending_suggestions" not in str(e):
+            raise
+    # Migration 008 not applied: insert the new rows first, then drop the old ones.
+    created = []
+    if slots:
+        r = (
             supabase.table("suggested_slots")
-            .select("start_time,end_time")
-            .eq("user_id", user_id)
-            .eq("status", status)
-            .gte("start_time", start_dt.isoformat())
-            .lte("end_time", end_dt.isoformat())
+            .insert([{**slot, "task_id": task_id, "user_id": user_id, "status": "pending"} for slot in slots])
             .execute()
         )
-        existing_busy.extend(
-            {"start": row["start_time"], "end": row["end_time"]} for row in (res.data or [])
-        )
+        created = r.data or []
+    q = supabase.table("suggested_slots").delete().eq("task_id", task_id).eq("user_id", user_id).eq("status", "pending")
+    if created:
+        q = q.not_.in_("id", [row["id"] for row in created])
+    q.execute()
+    return created
 
-    ranked_slots = []
-    seen = set()  # dedupe by exact start/end within this run
-    for cs, ce in candidates:
-        busy = get_busy(user_id, supabase, cs.isoformat(), ce.isoformat()) + existing_busy
-        for s_start, s_end in slots_from_busy(busy, cs, ce, duration_min):
-            key = f"{s_start}|{s_end}"
-            if key in seen:
-                continue
-            seen.add(key)
-            start_dt_slot = parse_iso(s_start)
-            if start_dt_slot.tzinfo is None:
-                start_dt_slot = start_dt_slot.replace(tzinfo=timezone.utc)
-            end_dt_slot = parse_iso(s_end)
-            if end_dt_slot.tzinfo is None:
-                end_dt_slot = end_dt_slot.replace(tzinfo=timezone.utc)
-            local_start = start_dt_slot.astimezone(tz)
-            local_end = end_dt_slot.astimezone(tz)
-            if not (_within_pref_window(local_start, pref) and _within_pref_window(local_end, pref)):
-                continue
-            score = _score_slot(start_dt_slot, start_dt, pref_center_minutes)
-            ranked_slots.append((score, s_start, s_end))
-
-    ranked_slots.sort(key=lambda row: (row[0], row[1]), reverse=True)
 
-    # Spread picks across days to avoid clustering
-    by_day: dict[str, list] = {}
-    for score, s_start, s_end in ranked_slots:
-        day = s_start.split('T', 1)[0]
-        by_day.setdefault(day, []).append((score, s_start, s_end))
-    # keep per-day order by score (already sorted globally), so lists are in encountered order
-    days = sorted(by_day.keys())
-    suggestions_list = []
-    while len(suggestions_list) < limit and any(by_day.values()):
-        for d in days:
-            if len(suggestions_list) >= limit:
-                break
-            bucket = by_day.get(d, [])
-            if bucket:
-                score, s_start, s_end = bucket.pop(0)
-                # final guard on window before insert
-                st = parse_iso(s_start)
-                if st.tzinfo is None:
-                    st = st.replace(tzinfo=timezone.utc)
-                en = parse_iso(s_end)
-                if en.tzinfo is None:
-                    en = en.replace(tzinfo=timezone.utc)
-                st_local = st.astimezone(tz)
-                en_local = en.astimezone(tz)
-                if not (_within_pref_window(st_local, pref) and _within_pref_window(en_local, pref)):
-                    continue
-                r = (
-                    supabase.table("suggested_slots")
-                    .insert(
-                        {
-                            "task_id": task["id"],
-                            "user_id": user_id,
-                            "start_time": s_start,
-                            "end_time": s_end,
-                            "status": "pending",
-                        }
-                    )
-                    .execute()
-                )
-                suggestions_list.append(r.data[0])
-        # remove empty buckets
-        by_day = {k: v for k, v in by_day.items() if v}
-    return suggestions_list
+def _suggestion_tz():
+    # Force EST (America/New_York) to avoid missing/invalid timezone data
+    try:
+        return ZoneInfo("America/New_York")
+    except Exception:
+        return timezone.utc
 
 
 def _suggestions_remaining(user_id: str, supabase, statuses: tuple = ("pending",)) -> int:
@@ -281,73 +259,148 @@ def _suggestions_remaining(user_id: str, supabase, statuses: tuple = ("pending",
     return max(0, MAX_SUGGESTIONS - current)
 
 
+def _load_task(supabase, user_id: str, task_id: str) -> Optional[dict]:
+    r = supabase.table("tasks").select("*").eq("id", task_id).eq("user_id", user_id).single().execute()
+    return r.data
+
+
+def _clear_pending(supabase, user_id: str, task_id: str) -> None:
+    supabase.table("suggested_slots").delete().eq("task_id", task_id).eq("user_id", user_id).eq("status", "pending").execute()
+
+
 @router.post("/suggest/{task_id}")
-def suggest_slots(
+async def suggest_slots(
     task_id: str,
     start: str,
     end: str,
+    response: Response,
     limit: int = 5,
     user_id: str = Depends(get_current_user_id),
     supabase=Depends(get_supabase),
 ):
-    """Compute suggested slots for task and save; return suggestions."""
+    """Compute suggested slots for task and save; return suggestions.
+
+    Async so the busy-time read awaits the calendar code directly; database
+    calls go through the threadpool.
+    """
     limit = max(3, min(limit, 20))  # clamp between 3 and 20 to avoid overload
-    remaining = _suggestions_remaining(user_id, supabase, statuses=("pending",))
+    remaining = await run_in_threadpool(_suggestions_remaining, user_id, supabase, ("pending",))
     if remaining <= 0:
         raise HTTPException(400, f"Maximum pending suggestions reached ({MAX_SUGGESTIONS}). Reject or approve some before adding more.")
     limit = min(limit, remaining)
-    # Get task
-    tr = supabase.table("tasks").select("*").eq("id", task_id).eq("user_id", user_id).single().execute()
-    if not tr.data:
+    task = await run_in_threadpool(_load_task, supabase, user_id, task_id)
+    if not task:
         raise HTTPException(404, "Task not found")
-    task = tr.data
 
-    start_dt, end_dt = clamp_range(start, end)
-    # Force EST (America/New_York) to avoid missing/invalid timezone data
-    try:
-        tz = ZoneInfo("America/New_York")
-    except Exception:
-        tz = timezone.utc
-    approved_minutes = _approved_minutes_for_task(supabase, task_id, user_id)
+    start_dt, end_dt = clamp_range(start, end, max_days=MAX_HORIZON_DAYS)
+    tz = _suggestion_tz()
+    approved_minutes = _approved_minutes(task)
     limit = _desired_limit_for_task(task, approved_minutes, limit)
     if _task_complete(task, approved_minutes):
-        supabase.table("suggested_slots").delete().eq("task_id", task_id).eq("user_id", user_id).eq("status", "pending").execute()
+        await run_in_threadpool(_clear_pending, supabase, user_id, task_id)
         return []
 
-    return _generate_suggestions_for_task(task, user_id, supabase, start_dt, end_dt, limit, tz)
+    stats: dict = {}
+    created = await _generate_suggestions_for_task(task, user_id, supabase, start_dt, end_dt, limit, tz, stats=stats)
+    response.headers["X-Busy-Calls-Saved"] = str(stats.get("busy_calls_saved", 0))
+    return created
+
+
+def _status_filter(status: Optional[str]) -> Optional[list[str]]:
+    """Statuses to list: default pending and approved, ``all`` for no filter."""
+    if not status:
+        return ["pending", "approved"]
+    if status == "all":
+        return None
+    statuses = [s.strip() for s in status.split(",") if s.strip()]
+    unknown = sorted(set(statuses) - set(SUGGESTION_STATUSES))
+    if unknown:
+        raise HTTPException(400, f"Unknown status: {', '.join(unknown)}")
+    return statuses
 
 
 @router.get("")
 def list_suggestions(
+    request: Request,
+    response: Response,
     task_id: Optional[str] = None,
+    status: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    fields: Optional[str] = None,
     user_id: str = Depends(get_current_user_id),
     supabase=Depends(get_supabase),
 ):
-    q = supabase.table("suggested_slots").select("*").eq("user_id", user_id)
+    """Suggestions by start time, one page at a time; rejected rows only when asked for.
+
+    X-Next-Cursor carries the next page's cursor.
+    """
+    requested = projection(fields, SUGGESTION_FIELDS)
+    version = table_version(supabase, "suggested_slots", user_id)
+    if version and (requested is None or "task_name" in requested):
+        # Embedded task names change with the tasks table
+        task_version = table_version(supabase, "tasks", user_id)
+        version = version + task_version if task_version else None
+    tag = etag("suggestions", user_id, request.url.query, *version) if version else None
+    unchanged = not_modified(request, response, tag)
+    if unchanged:
+        return unchanged
+    if requested is None:
+        columns = "*,task:tasks(name)"
+    else:
+        columns = select_columns(requested, ("id", "start_time"), SUGGESTION_DERIVED_FIELDS)
+    q = supabase.table("suggested_slots").select(columns).eq("user_id", user_id)
     if task_id:
         q = q.eq("task_id", task_id)
-    r = q.order("start_time").execute()
-    # Enrich with task name for frontend display
-    if not r.data:
-        return []
-    task_ids = list({row["task_id"] for row in r.data})
-    task_names = {}
-    if task_ids:
-        names_r = (
+    statuses = _status_filter(status)
+    if statuses is not None:
+        q = q.in_("status", statuses)
+    rows = keyset_page(q, cursor, "start_time", page_size(limit), response)
+    for row in rows:
+        if "task" in row:
+            row["task_name"] = (row.pop("task") or {}).get("name", "")
+    return trim(rows, requested)
+
+
+class ApproveBody(BaseModel):
+    add_to_calendar: bool = True
+
+
+class ApproveBatchBody(BaseModel):
+    ids: list[str]
+    add_to_calendar: bool = True
+
+
+# Most suggestions one approve-batch call may take
+MAX_APPROVE_BATCH = 50
+
+
+def _task_totals(supabase, user_id: str, task_ids: list[str]) -> dict[str, dict]:
+    """{task_id: {estimated_minutes, approved_minutes}} for the user's tasks, in one query."""
+    try:
+        r = (
             supabase.table("tasks")
-            .select("id,name")
+            .select("id,estimated_minutes,approved_minutes")
             .in_("id", task_ids)
+            .eq("user_id", user_id)
             .execute()
         )
-        for row in names_r.data or []:
-            task_names[row["id"]] = row.get("name", "")
-    for row in r.data:
-        row["task_name"] = task_names.get(row["task_id"], "")
-    return r.data
+    except Exception as e:
+        if "estimated_minutes" in str(e):
+            raise HTTPException(500, "DB migration missing: run 005_task_estimated_minutes.sql") from e
+        if "approved_minutes" in str(e):
+            raise HTTPException(500, "DB migration missing: run 012_task_approved_minutes.sql") from e
+        return {}
+    return {row["id"]: row for row in r.data or []}
 
 
-class ApproveBody(BaseModel):
-    add_to_calendar: bool = True
+def _calendar_event(slot: dict, task: Optional[dict]) -> dict:
+    return {
+        "summary": task["name"] if task else "Skedule block",
+        "description": (task.get("description") or "") if task else "",
+        "start": {"dateTime": slot["start_time"], "timeZone": "UTC"},
+        "end": {"dateTime": slot["end_time"], "timeZone": "UTC"},
+    }
 
 
 @router.post("/{suggestion_id}/approve")
@@ -373,36 +426,17 @@ def approve_slot(
     supabase.table("suggested_slots").update({"status": "approved"}).eq("id", suggestion_id).execute()
     if body.add_to_calendar:
         task_r = supabase.table("tasks").select("name, description").eq("id", slot["task_id"]).single().execute()
-        name = task_r.data["name"] if task_r.data else "Skedule block"
-        desc = task_r.data.get("description", "") if task_r.data else ""
-        from api.calendar import get_calendar_service
         service = get_calendar_service(user_id, supabase)
-        event = {
-            "summary": name,
-            "description": desc,
-            "start": {"dateTime": slot["start_time"], "timeZone": "UTC"},
-            "end": {"dateTime": slot["end_time"], "timeZone": "UTC"},
-        }
-        service.events().insert(calendarId="primary", body=event).execute()
-    task = {}
-    try:
-        task_r = (
-            supabase.table("tasks")
-            .select("estimated_minutes")
-            .eq("id", slot["task_id"])
-            .eq("user_id", user_id)
-            .execute()
-        )
-        if task_r.data:
-            task = task_r.data[0]
-    except Exception as e:
-        if "estimated_minutes" in str(e):
-            raise HTTPException(500, "DB migration missing: run 004_task_estimated_minutes.sql") from e
-        task = {}
-    approved_minutes = _approved_minutes_for_task(supabase, slot["task_id"], user_id)
+        _, exc = insert_events(service, [_calendar_event(slot, task_r.data)])[0]
+        if exc is not None:
+            raise exc
+        calendar_changed(user_id, supabase, [(slot["start_time"], slot["end_time"])])
+    task = _task_totals(supabase, user_id, [slot["task_id"]]).get(slot["task_id"], {})
+    # The status update above already fired the approved_minutes trigger
+    approved_minutes = _approved_minutes(task) if task else 0
     task_complete = _task_complete(task, approved_minutes)
     if task_complete:
-        supabase.table("suggested_slots").delete().eq("task_id", slot["task_id"]).eq("user_id", user_id).eq("status", "pending").execute()
+        _clear_pending(supabase, user_id, slot["task_id"])
     return {
         "ok": True,
         "added_to_calendar": body.add_to_calendar,
@@ -412,6 +446,97 @@ def approve_slot(
     }
 
 
+@router.post("/approve-batch")
+def approve_batch(
+    body: ApproveBatchBody,
+    user_id: str = Depends(get_current_user_id),
+    supabase=Depends(get_supabase),
+):
+    """Approve several suggestions: one read, one status update, one calendar batch.
+
+    Returns a result per id (in request order) and the approved/estimated
+    totals of every task touched. Tasks that become complete lose their
+    remaining pending suggestions, as with single approvals.
+    """
+    ids = list(dict.fromkeys(body.ids))
+    if not ids:
+        raise HTTPException(400, "No suggestion ids given")
+    if len(ids) > MAX_APPROVE_BATCH:
+        raise HTTPException(400, f"At most {MAX_APPROVE_BATCH} suggestions per batch")
+    r = (
+        supabase.table("suggested_slots")
+        .select("id,task_id,status,start_time,end_time,task:tasks(name,description)")
+        .in_("id", ids)
+        .eq("user_id", user_id)
+        .execute()
+    )
+    slots = {row["id"]: row for row in r.data or []}
+    results: dict[str, dict] = {}
+    for sid in ids:
+        if sid not in slots:
+            results[sid] = {"id": sid, "ok": False, "error": "Suggestion not found"}
+        elif slots[sid]["status"] != "pending":
+            results[sid] = {"id": sid, "ok": False, "error": "Already processed"}
+    pending = [slots[sid] for sid in ids if sid not in results]
+    # Build the service first so a disconnected calendar fails before anything changes
+    service = get_calendar_service(user_id, supabase) if body.add_to_calendar and pending else None
+    approved: list[dict] = []
+    if pending:
+        # The status guard skips rows another request approved or rejected meanwhile
+        upd = (
+            supabase.table("suggested_slots")
+            .update({"status": "approved"})
+            .in_("id", [slot["id"] for slot in pending])
+            .eq("user_id", user_id)
+            .eq("status", "pending")
+            .execute()
+        )
+        flipped = {row["id"] for row in upd.data or []}
+        for slot in pending:
+            if slot["id"] in flipped:
+                approved.append(slot)
+            else:
+                results[slot["id"]] = {"id": slot["id"], "ok": False, "error": "Already processed"}
+    outcomes = [(None, None)] * len(approved)
+    if service is not None and approved:
+        outcomes = insert_events(service, [_calendar_event(slot, slot.get("task")) for slot in approved])
+        calendar_changed(user_id, supabase, [(slot["start_time"], slot["end_time"]) for slot in approved])
+    for slot, (created, exc) in zip(approved, outcomes):
+        result = {
+            "id": slot["id"],
+            "ok": True,
+            "task_id": slot["task_id"],
+            "added_to_calendar": service is not None and exc is None,
+        }
+        if created:
+            result["event_id"] = created.get("id")
+        if exc is not None:
+            result["error"] = f"Calendar insert failed: {exc}"
+        results[slot["id"]] = result
+
+    task_ids = list(dict.fromkeys(slot["task_id"] for slot in approved))
+    totals = _task_totals(supabase, user_id, task_ids) if task_ids else {}
+    tasks = {}
+    for task_id in task_ids:
+        # The status update above already fired the approved_minutes trigger
+        task = totals.get(task_id, {})
+        approved_minutes = _approved_minutes(task) if task else 0
+        tasks[task_id] = {
+            "approved_minutes": approved_minutes,
+            "estimated_minutes": _coerce_minutes(task.get("estimated_minutes")),
+            "task_complete": _task_complete(task, approved_minutes),
+        }
+    complete = [task_id for task_id, t in tasks.items() if t["task_complete"]]
+    if complete:
+        supabase.table("suggested_slots").delete().in_("task_id", complete).eq("user_id", user_id).eq("status", "pending").execute()
+    return {
+        "ok": True,
+        "approved": len(approved),
+        "results": [results[sid] for sid in ids],
+        "tasks": tasks,
+    }
+
+
 @router.post("/{suggestion_id}/reject")
 def reject_slot(
     suggestion_id: str,
@@ -430,8 +555,23 @@ def reject_slot(
     return {"ok": True}
 
 
+def _reject_pending(supabase, user_id: str, task_id: Optional[str]) -> int:
+    q = supabase.table("suggested_slots").update({"status": "rejected"}).eq("user_id", user_id).eq("status", "pending")
+    if task_id:
+        q = q.eq("task_id", task_id)
+    return len(q.execute().data or [])
+
+
+def _tasks_to_resuggest(supabase, user_id: str, task_id: Optional[str]) -> list[dict]:
+    if task_id:
+        task = _load_task(supabase, user_id, task_id)
+        return [task] if task else []
+    tasks_r = supabase.table("tasks").select("*").eq("user_id", user_id).execute()
+    return tasks_r.data or []
+
+
 @router.post("/reject-all")
-def reject_all(
+async def reject_all(
     task_id: Optional[str] = None,
     start: Optional[str] = None,
     end: Optional[str] = None,
@@ -440,44 +580,29 @@ def reject_all(
     user_id: str = Depends(get_current_user_id),
     supabase=Depends(get_supabase),
 ):
-    q = supabase.table("suggested_slots").update({"status": "rejected"}).eq("user_id", user_id).eq("status", "pending")
-    if task_id:
-        q = q.eq("task_id", task_id)
-    r = q.execute()
+    rejected = await run_in_threadpool(_reject_pending, supabase, user_id, task_id)
     resuggested = 0
+    stats: dict = {}
     if resuggest:
-        remaining = _suggestions_remaining(user_id, supabase, statuses=("pending",))
+        remaining = await run_in_threadpool(_suggestions_remaining, user_id, supabase, ("pending",))
         if remaining <= 0:
-            return {"ok": True, "rejected": len(r.data or []), "resuggested": 0, "message": f"Maximum pending suggestions reached ({MAX_SUGGESTIONS}). Reject or approve some before adding more."}
+            return {"ok": True, "rejected": rejected, "resuggested": 0, "message": f"Maximum pending suggestions reached ({MAX_SUGGESTIONS}). Reject or approve some before adding more."}
         if start and end:
-            start_dt, end_dt = clamp_range(start, end)
+            start_dt, end_dt = clamp_range(start, end, max_days=MAX_HORIZON_DAYS)
         else:
             now = datetime.now(timezone.utc)
             start_dt = datetime(now.year, now.month, now.day, tzinfo=timezone.utc)
             end_dt = start_dt + timedelta(days=7)
         limit = max(3, min(limit, 20))
-        if task_id:
-            task_r = (
-                supabase.table("tasks")
-                .select("*")
-                .eq("id", task_id)
-                .eq("user_id", user_id)
-                .single()
-                .execute()
-            )
-            tasks = [task_r.data] if task_r.data else []
-        else:
-            tasks_r = supabase.table("tasks").select("*").eq("user_id", user_id).execute()
-            tasks = tasks_r.data or []
-        for task in tasks:
-            approved_minutes = _approved_minutes_for_task(supabase, task["id"], user_id)
-            task_limit = _desired_limit_for_task(task, approved_minutes, limit)
-            if _task_complete(task, approved_minutes):
-                continue
-            if remaining <= 0:
-                break
-            take = min(task_limit, remaining)
-            created = _generate_suggestions_for_task(task, user_id, supabase, start_dt, end_dt, take)
-            resuggested += len(created)
-            remaining -= len(created)
-    return {"ok": True, "rejected": len(r.data or []), "resuggested": resuggested}
+        tz = _suggestion_tz()
+        tasks = await run_in_threadpool(_tasks_to_resuggest, supabase, user_id, task_id)
+        created = await _schedule_tasks_jointly(
+            tasks, user_id, supabase, start_dt, end_dt, limit, remaining, tz, stats=stats,
+        )
+        resuggested = len(created)
+    return {
+        "ok": True,
+        "rejected": rejected,
+        "resuggested": resuggested,
+        "busy_calls_saved": stats.get("busy_calls_saved", 0),
+    }
@@ -1,41 +1,31 @@
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from pydantic import BaseModel, field_validator
 from enum import Enum
 
 from api.deps import get_current_user_id, get_supabase
-from api.time_utils import parse_iso
+from api.etag import etag, not_modified, table_version
+from api.listing import keyset_page, page_size, projection, select_columns, trim
 
 
-def _minutes_between(start: str, end: str) -> int:
-    try:
-        s = parse_iso(start)
-        e = parse_iso(end)
-    except Exception:
-        return 0
-    delta = e - s
-    return max(0, int(round(delta.total_seconds() / 60.0)))
+def _approved_minutes(task: dict) -> int:
+    """Approved suggestion minutes, kept on the task row by a trigger (migration 012)."""
+    if "approved_minutes" not in task:
+        raise HTTPException(500, "DB migration missing: run 012_task_approved_minutes.sql")
+    return task.get("approved_minutes") or 0
 
 
-def _approved_minutes_map(supabase, user_id: str) -> dict:
-    res = (
-        supabase.table("suggested_slots")
-        .select("task_id,start_time,end_time")
-        .eq("user_id", user_id)
-        .eq("status", "approved")
-        .execute()
-    )
-    totals: dict[str, int] = {}
-    for row in res.data or []:
-        task_id = row.get("task_id")
-        if not task_id:
-            continue
-        minutes = _minutes_between(row.get("start_time"), row.get("end_time"))
-        totals[task_id] = totals.get(task_id, 0) + minutes
-    return totals
-
 router = APIRouter()
 
+# Fields a task listing may project with ?fields=
+TASK_FIELDS = {
+    "id", "name", "description", "difficulty", "focus_level", "focus_minutes",
+    "time_preference", "created_at", "estimated_minutes", "estimate_updated_at",
+    "approved_minutes", "is_complete",
+}
+# Computed fields and the columns they are derived from
+TASK_DERIVED_FIELDS = {"is_complete": ("estimated_minutes", "approved_minutes")}
+
 
 class DifficultyLevel(str, Enum):
     EASY = "easy"
@@ -91,18 +81,31 @@ class TaskUpdate(BaseModel):
 
 
 @router.get("")
-def list_tasks(user_id: str = Depends(get_current_user_id), supabase=Depends(get_supabase)):
-    r = supabase.table("tasks").select("*").eq("user_id", user_id).order("created_at", desc=True).execute()
-    tasks = r.data or []
-    if not tasks:
-        return []
-    approved_map = _approved_minutes_map(supabase, user_id)
-    for t in tasks:
-        approved = approved_map.get(t.get("id"), 0)
-        estimated = t.get("estimated_minutes")
-        t["approved_minutes"] = approved
-        t["is_complete"] = bool(estimated is not None and approved >= estimated)
-    return tasks
+def list_tasks(
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    fields: Optional[str] = None,
+    user_id: str = Depends(get_current_user_id),
+    supabase=Depends(get_supabase),
+):
+    """Newest tasks first, one page at a time; X-Next-Cursor carries the next page's cursor."""
+    version = table_version(supabase, "tasks", user_id)
+    tag = etag("tasks", user_id, request.url.query, *version) if version else None
+    unchanged = not_modified(request, response, tag)
+    if unchanged:
+        return unchanged
+    requested = projection(fields, TASK_FIELDS)
+    columns = "*" if requested is None else select_columns(requested, ("id", "created_at"), TASK_DERIVED_FIELDS)
+    q = supabase.table("tasks").select(columns).eq("user_id", user_id)
+    tasks = keyset_page(q, cursor, "created_at", page_size(limit), response, desc=True)
+    if requested is None or "is_complete" in requested:
+        for t in tasks:
+            approved = _approved_minutes(t)
+            estimated = t.get("estimated_minutes")
+            t["is_complete"] = bool(estimated is not None and approved >= estimated)
+    return trim(tasks, requested)
 
 
 @router.post("")
@@ -146,10 +149,8 @@ def get_task(
     if not r.data:
         raise HTTPException(404, "Task not found")
     task = r.data
-    approved_map = _approved_minutes_map(supabase, user_id)
-    approved = approved_map.get(task.get("id"), 0)
+    approved = _approved_minutes(task)
     estimated = task.get("estimated_minutes")
-    task["approved_minutes"] = approved
     task["is_complete"] = bool(estimated is not None and approved >= estimated)
     task["focus_minutes"] = task.get("focus_minutes")
     task["focus_level"] = task.get("focus_level")
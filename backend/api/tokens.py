@@ -0,0 +1,264 @@
+"""Google OAuth tokens kept in memory, refreshed single-flight and ahead of expiry."""
+import asyncio
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+import httpx
+from fastapi import HTTPException
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+TOKEN_URI = "https://oauth2.googleapis.com/token"
+
+
+def _parse_expiry(value) -> Optional[datetime]:
+    if isinstance(value, datetime):
+        expiry = value
+    elif isinstance(value, str) and value:
+        try:
+            expiry = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except Exception:
+            try:
+                expiry = datetime.fromisoformat(value.split(".")[0] + "+00:00")
+            except Exception:
+                return None
+    else:
+        return None
+    if expiry.tzinfo is None:
+        expiry = expiry.replace(tzinfo=timezone.utc)
+    return expiry.astimezone(timezone.utc)
+
+
+@dataclass
+class TokenRecord:
+    access_token: str
+    refresh_token: str
+    expiry: Optional[datetime]  # aware UTC; None means unknown, treat as expired
+    last_used: float = field(default_factory=time.monotonic)
+
+    def expires_within(self, seconds: float) -> bool:
+        if self.expiry is None:
+            return True
+        return datetime.now(timezone.utc) + timedelta(seconds=seconds) >= self.expiry
+
+    @property
+    def naive_expiry(self) -> Optional[datetime]:
+        # google-auth compares against a naive utcnow(); keep expiry naive UTC too
+        return self.expiry.replace(tzinfo=None) if self.expiry else None
+
+
+class TokenManager:
+    """Per-process token store for calendar_tokens.
+
+    Request paths read tokens from memory; only a cold start or an already
+    expired token goes to Supabase or Google. Concurrent refreshes for one user
+    share a single call to the token endpoint, and refreshed tokens are written
+    back to calendar_tokens by the background loop.
+    """
+
+    def __init__(self):
+        self._tokens: dict[str, TokenRecord] = {}
+        self._locks: dict[str, threading.Lock] = {}
+        self._guard = threading.Lock()
+        self._pending_writes: dict[str, dict] = {}
+        self._http: Optional[httpx.Client] = None
+        self.loads = 0
+        self.refreshes = 0
+        self.background_refreshes = 0
+        self.writes_flushed = 0
+
+    def start(self) -> None:
+        if self._http is None:
+            self._http = httpx.Client(
+                timeout=10.0,
+                limits=httpx.Limits(max_keepalive_connections=10, max_connections=20),
+            )
+
+    def close(self, supabase=None) -> None:
+        if supabase is not None:
+            self.flush(supabase)
+        if self._http is not None:
+            self._http.close()
+            self._http = None
+
+    def _lock_for(self, user_id: str) -> threading.Lock:
+        with self._guard:
+            lock = self._locks.get(user_id)
+            if lock is None:
+                lock = self._locks[user_id] = threading.Lock()
+            return lock
+
+    def get(self, user_id: str, supabase) -> TokenRecord:
+        record = self._tokens.get(user_id)
+        if record is None:
+            record = self._load(user_id, supabase)
+        record.last_used = time.monotonic()
+        if record.expires_within(0):
+            record = self._refresh(user_id, record)
+        return record
+
+    def _load(self, user_id: str, supabase) -> TokenRecord:
+        with self._lock_for(user_id):
+            record = self._tokens.get(user_id)
+            if record is not None:
+                return record
+            r = supabase.table("calendar_tokens").select("*").eq("user_id", user_id).single().execute()
+            if not r.data:
+                raise HTTPException(400, "Google Calendar not connected. Connect in Settings.")
+            row = r.data
+            if not row.get("access_token") or not row.get("refresh_token"):
+                raise HTTPException(400, "Google Calendar token missing; reconnect your calendar.")
+            record = TokenRecord(
+                access_token=row["access_token"],
+                refresh_token=row["refresh_token"],
+                expiry=_parse_expiry(row.get("token_expiry")),
+            )
+            self._tokens[user_id] = record
+            self.loads += 1
+            return record
+
+    def _refresh(self, user_id: str, stale: TokenRecord, margin: float = 0) -> TokenRecord:
+        with self._lock_for(user_id):
+            current = self._tokens.get(user_id)
+            if current is None:
+                # Disconnected while we waited
+                raise HTTPException(400, "Google Calendar not connected. Connect in Settings.")
+            if current.access_token != stale.access_token and not current.expires_within(margin):
+                return current  # another caller refreshed while we waited
+            self.start()
+            resp = self._http.post(
+                TOKEN_URI,
+                data={
+                    "client_id": settings.google_client_id,
+                    "client_secret": settings.google_client_secret,
+                    "refresh_token": current.refresh_token,
+                    "grant_type": "refresh_token",
+                },
+                headers={"Content-Type": "application/x-www-form-urlencoded"},
+            )
+            data = resp.json()
+            if not data.get("access_token"):
+                raise HTTPException(400, "Google Calendar token refresh failed; reconnect your calendar.")
+            record = TokenRecord(
+                access_token=data["access_token"],
+                refresh_token=data.get("refresh_token") or current.refresh_token,
+                expiry=datetime.now(timezone.utc) + timedelta(seconds=data.get("expires_in", 3600)),
+                last_used=current.last_used,
+            )
+            self._tokens[user_id] = record
+            self.refreshes += 1
+            with self._guard:
+                self._pending_writes[user_id] = {
+                    "user_id": user_id,
+                    "access_token": record.access_token,
+                    "refresh_token": record.refresh_token,
+                    "token_expiry": record.expiry.isoformat(),
+                    "updated_at": datetime.now(timezone.utc).isoformat(),
+                }
+            return record
+
+    def forget(self, user_id: str) -> None:
+        """Drop a user's tokens (disconnect/reconnect) including unflushed writes.
+
+        Takes the user's lock first, so a refresh in flight finishes before its
+        token and pending write are dropped rather than landing afterwards.
+        """
+        with self._lock_for(user_id):
+            with self._guard:
+                self._tokens.pop(user_id, None)
+                self._pending_writes.pop(user_id, None)
+
+    def flush(self, supabase) -> int:
+        """Write refreshed tokens back to existing calendar_tokens rows.
+
+        One update_calendar_tokens call (migration 015) per flush, falling back
+        to an update per row when the function is missing. Updates only: a
+        write racing a disconnect matches no row instead of re-creating the
+        one disconnect deleted.
+        """
+        with self._guard:
+            rows = list(self._pending_writes.values())
+            self._pending_writes.clear()
+        if not rows:
+            return 0
+        try:
+            supabase.rpc("update_calendar_tokens", {"p_rows": rows}).execute()
+            written = len(rows)
+        except Exception as e:
+            if "update_calendar_tokens" not in str(e):
+                logger.exception("Failed to persist %d refreshed calendar tokens", len(rows))
+                self._requeue(rows)
+                return 0
+            written = self._flush_rows(supabase, rows)
+        self.writes_flushed += written
+        return written
+
+    def _flush_rows(self, supabase, rows: list[dict]) -> int:
+        # Migration 015 not applied: one update per row.
+        written = 0
+        for row in rows:
+            try:
+                supabase.table("calendar_tokens").update(
+                    {k: v for k, v in row.items() if k != "user_id"}
+                ).eq("user_id", row["user_id"]).execute()
+                written += 1
+            except Exception:
+                logger.exception("Failed to persist refreshed calendar tokens for %s", row["user_id"])
+                self._requeue([row])
+        return written
+
+    def _requeue(self, rows: list[dict]) -> None:
+        with self._guard:
+            for row in rows:
+                # Retry next round unless the user was forgotten meanwhile
+                if row["user_id"] in self._tokens:
+                    self._pending_writes.setdefault(row["user_id"], row)
+
+    def _due_for_refresh(self) -> list[tuple[str, TokenRecord]]:
+        idle_cutoff = time.monotonic() - settings.token_idle_seconds
+        due = []
+        with self._guard:
+            for user_id, record in list(self._tokens.items()):
+                if record.last_used < idle_cutoff:
+                    # Stop keeping tokens warm for users who went away
+                    del self._tokens[user_id]
+                    continue
+                if record.expires_within(settings.token_refresh_margin_seconds):
+                    due.append((user_id, record))
+        return due
+
+    async def run_background(self, get_supabase) -> None:
+        """Refresh tokens shortly before expiry and flush pending writes."""
+        while True:
+            await asyncio.sleep(settings.token_refresh_interval_seconds)
+            for user_id, record in self._due_for_refresh():
+                try:
+                    await asyncio.to_thread(
+                        self._refresh, user_id, record, settings.token_refresh_margin_seconds
+                    )
+                    self.background_refreshes += 1
+                except Exception:
+                    logger.warning("Background token refresh failed for %s", user_id, exc_info=True)
+            try:
+                await asyncio.to_thread(self.flush, get_supabase())
+            except Exception:
+                logger.exception("Token write-back failed")
+
+    def stats(self) -> dict:
+        return {
+            "tokens": len(self._tokens),
+            "loads": self.loads,
+            "refreshes": self.refreshes,
+            "background_refreshes": self.background_refreshes,
+            "pending_writes": len(self._pending_writes),
+            "writes_flushed": self.writes_flushed,
+        }
+
+
+token_manager = TokenManager()
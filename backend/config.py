@@ -23,8 +23,17 @@ class Settings(BaseSettings):
         default="",
         validation_alias=AliasChoices("supabase_secret_key", "supabase_service_key"),
     )
-    # Only needed if you still mint/verify legacy JWTs yourself.
+    # Required when the project signs access tokens with the legacy HS256
+    # secret (no asymmetric JWT signing keys); checked at startup.
     supabase_jwt_secret: str = ""
+    # Verify access token signatures (HS256 with the secret above, or
+    # asymmetric keys from the project's JWKS). Disable only for local dev.
+    jwt_verify_signature: bool = True
+    jwt_claims_cache_size: int = 10000
+    # Refetch JWKS in the background after this long; an unknown kid forces
+    # a refetch at most once per the minimum interval.
+    jwks_refresh_seconds: int = 3600
+    jwks_min_refresh_seconds: int = 30
 
     google_client_id: str = ""
     google_client_secret: str = ""
@@ -33,6 +42,62 @@ class Settings(BaseSettings):
     app_url: str = "https://skedule-orange.vercel.app"
     cors_allow_origins: str = ""
     backend_url: str = "https://skedule.onrender.com"
+    # Number of shared Supabase clients (each keeps its own keep-alive session).
+    supabase_pool_size: int = 4
+    # Built Google Calendar service objects, per user and access token.
+    calendar_service_cache_size: int = 512
+    calendar_service_cache_ttl_seconds: int = 3600
+    # calendarList results per user; revalidated with ETag after the TTL.
+    calendar_list_cache_size: int = 1024
+    calendar_list_ttl_seconds: int = 300
+    # Max concurrent Google Calendar requests per user.
+    calendar_fetch_concurrency: int = 5
+    # List events for several calendars through Google's batch endpoint
+    # (one round-trip) instead of concurrent per-calendar requests.
+    calendar_batch_requests: bool = True
+    # Serve events/busy from the local store kept current with Google sync
+    # tokens; sync at most every interval, covering lookback days back.
+    calendar_incremental_sync: bool = True
+    calendar_sync_interval_seconds: int = 60
+    calendar_sync_lookback_days: int = 30
+    # In-process copy of calendar_day_cache rows. Other workers cannot be
+    # invalidated from here, so entries also expire after the TTL.
+    day_cache_size: int = 8192
+    day_cache_ttl_seconds: int = 300
+    # Past CACHE_TTL_SECONDS, /week serves cached days marked stale while a
+    # background refresh runs, until they are this old. Busy time used for
+    # scheduling is always refetched once past CACHE_TTL_SECONDS.
+    calendar_stale_while_revalidate: bool = True
+    day_cache_max_stale_seconds: int = 86400
+    # Shared Gemini client: max calls in flight, per-call deadline covering
+    # retries, and jittered exponential backoff between retries.
+    gemini_concurrency: int = 8
+    gemini_timeout_seconds: float = 30.0
+    gemini_max_retries: int = 2
+    gemini_retry_base_seconds: float = 0.5
+    # Send plan prompts as minute offsets from a local base time instead of
+    # ISO blocks; free blocks separated by less than the merge gap are joined,
+    # and ones shorter than the minimum are left out.
+    plan_compact_payload: bool = True
+    plan_min_free_minutes: int = 15
+    plan_merge_gap_minutes: int = 10
+    # Answer estimate_only /api/plan calls from the user's past tasks when
+    # the nearest-neighbour estimate is at least this confident.
+    local_estimator: bool = True
+    local_estimate_min_confidence: float = 0.6
+    # Gemini plan responses keyed by a hash of model + prompt; optionally
+    # persisted in the plan_cache table so they survive restarts.
+    plan_cache_size: int = 1024
+    plan_cache_ttl_seconds: int = 3600
+    plan_cache_persistent: bool = False
+    # Background OAuth token refresh: how often to scan, how early to refresh,
+    # and how long an unused token stays in memory.
+    token_refresh_interval_seconds: int = 60
+    token_refresh_margin_seconds: int = 300
+    token_idle_seconds: int = 3600
+    # /api/stats (per-process cache and client counters): off unless enabled,
+    # and then only for signed-in users
+    runtime_stats_enabled: bool = False
 
     # Backwards compatibility properties
     @property
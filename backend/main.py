@@ -1,10 +1,39 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
+from fastapi import Depends, FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 
 from api import auth, tasks, calendar as calendar_api, suggestions, profile, llm
+from api.calendar import calendar_list_cache_stats, service_cache_stats, day_cache_stats
+from api.deps import auth_stats, check_auth_config, get_current_user_id, supabase_pool
+from api.gcal_async import calendar_client
+from api.estimator import estimator_stats
+from api.gemini import gemini_client
+from api.llm import plan_cache_stats
+from api.tokens import token_manager
 from config import settings
 
-app = FastAPI(title="Skedule API")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    check_auth_config()
+    supabase_pool.start()
+    token_manager.start()
+    calendar_client.start()
+    token_refresher = asyncio.create_task(token_manager.run_background(supabase_pool.get))
+    try:
+        yield
+    finally:
+        token_refresher.cancel()
+        with suppress(asyncio.CancelledError):
+            await token_refresher
+        await calendar_client.aclose()
+        token_manager.close(supabase_pool.get())
+        supabase_pool.close()
+
+
+app = FastAPI(title="Skedule API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -13,6 +42,7 @@ app.add_middleware(
     allow_credentials=False,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Busy-Calls-Saved", "X-Next-Cursor"],
 )
 
 app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
@@ -33,6 +63,23 @@ def public_config():
     }
 
 
+@app.get("/api/stats")
+def runtime_stats(user_id: str = Depends(get_current_user_id)):
+    if not settings.runtime_stats_enabled:
+        raise HTTPException(404, "Not Found")
+    return {
+        "supabase_pool": supabase_pool.stats(),
+        "auth": auth_stats(),
+        "calendar_service_cache": service_cache_stats(),
+        "calendar_list_cache": calendar_list_cache_stats(),
+        "calendar_day_cache": day_cache_stats(),
+        "calendar_tokens": token_manager.stats(),
+        "plan_cache": plan_cache_stats(),
+        "gemini": gemini_client.stats(),
+        "estimator_indexes": estimator_stats(),
+    }
+
+
 @app.get("/")
 def root():
     return {"name": "Skedule API", "status": "ok"}
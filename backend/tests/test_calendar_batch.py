@@ -0,0 +1,123 @@
+"""Batched events.list must match per-calendar listing, against a local fake Calendar API.
+
+Run from backend/:  python -m pytest tests
+"""
+import asyncio
+import json
+from datetime import datetime, timezone
+from email.parser import BytesParser
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import httplib2
+import httpx
+from googleapiclient.discovery import build_from_document
+
+from api import calendar
+from api.gcal_async import CALENDAR_API, AsyncCalendarClient
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+END = datetime(2024, 1, 8, tzinfo=timezone.utc)
+
+
+def _event(eid: str, day: int) -> dict:
+    return {
+        "id": eid,
+        "summary": eid,
+        "start": {"dateTime": f"2024-01-0{day}T10:00:00Z"},
+        "end": {"dateTime": f"2024-01-0{day}T11:00:00Z"},
+    }
+
+
+# Pages of events per calendar; None answers 404
+CALENDARS = {
+    "primary": [[_event("p1", 1), _event("p2", 2)], [_event("p3", 3)]],
+    "work@example.com": [[_event("w1", 2)]],
+    "gone@example.com": None,
+}
+
+
+def _events_response(path: str, query: dict) -> tuple[int, dict]:
+    """What the Calendar API answers to GET /calendar/v3/calendars/{id}/events."""
+    cid = unquote(path.split("/calendars/", 1)[1].rsplit("/events", 1)[0])
+    pages = CALENDARS.get(cid)
+    if pages is None:
+        return 404, {"error": {"code": 404, "message": "Not Found"}}
+    page = int(query.get("pageToken", ["0"])[0])
+    body = {"items": pages[page]}
+    if page + 1 < len(pages):
+        body["nextPageToken"] = str(page + 1)
+    return 200, body
+
+
+class FakeGoogleHttp:
+    """httplib2 stand-in serving events.list directly and through /batch/calendar/v3."""
+
+    def __init__(self, fail_batch: bool = False):
+        self.fail_batch = fail_batch
+        self.batch_calls = 0
+
+    def request(self, uri, method="GET", body=None, headers=None, **kwargs):
+        url = urlsplit(uri)
+        if url.path.startswith("/batch/"):
+            return self._batch(body, headers)
+        status, payload = _events_response(url.path, parse_qs(url.query))
+        return httplib2.Response({"status": status, "content-type": "application/json"}), json.dumps(payload).encode()
+
+    def _batch(self, body, headers):
+        self.batch_calls += 1
+        if self.fail_batch:
+            raise httplib2.HttpLib2Error("batch endpoint unreachable")
+        body = body.encode() if isinstance(body, str) else body
+        message = BytesParser().parsebytes(f"Content-Type: {headers['content-type']}\r\n\r\n".encode() + body)
+        parts = []
+        for part in message.get_payload():
+            request_line = part.get_payload().splitlines()[0]
+            url = urlsplit(request_line.split(" ")[1])
+            status, payload = _events_response(url.path, parse_qs(url.query))
+            content_id = part["Content-ID"].replace("<", "<response-", 1)
+            parts.append(
+                "--fake_boundary\r\n"
+                "Content-Type: application/http\r\n"
+                f"Content-ID: {content_id}\r\n\r\n"
+                f"HTTP/1.1 {status} OK\r\n"
+                "Content-Type: application/json\r\n\r\n"
+                f"{json.dumps(payload)}\r\n"
+            )
+        content = "".join(parts) + "--fake_boundary--\r\n"
+        resp = httplib2.Response({"status": 200, "content-type": "multipart/mixed; boundary=fake_boundary"})
+        return resp, content.encode()
+
+
+def _async_client() -> AsyncCalendarClient:
+    def handler(request: httpx.Request) -> httpx.Response:
+        status, payload = _events_response(request.url.path, parse_qs(request.url.query.decode()))
+        return httpx.Response(status, json=payload)
+
+    client = AsyncCalendarClient()
+    client._http = httpx.AsyncClient(base_url=CALENDAR_API, transport=httpx.MockTransport(handler))
+    return client
+
+
+def _service(http: FakeGoogleHttp):
+    return build_from_document(calendar._calendar_discovery(), http=http)
+
+
+def test_batched_listing_matches_per_calendar():
+    cal_ids = list(CALENDARS)
+    http = FakeGoogleHttp()
+    batched = calendar._list_events_batched(_service(http), START, END, cal_ids)
+    per_calendar = asyncio.run(_async_client().list_events_many("u1", "token", cal_ids, START, END))
+    assert http.batch_calls == 1
+    assert batched == per_calendar
+    assert [len(items) for items in batched] == [3, 1, 0]
+
+
+def test_batch_failure_falls_back_to_per_calendar(monkeypatch):
+    cal_ids = list(CALENDARS)
+    http = FakeGoogleHttp(fail_batch=True)
+    monkeypatch.setattr(calendar.settings, "calendar_batch_requests", True)
+    monkeypatch.setattr(calendar, "get_calendar_service", lambda user_id, supabase: _service(http))
+    monkeypatch.setattr(calendar, "calendar_client", _async_client())
+    events = asyncio.run(calendar._list_events("u1", "token", START, END, cal_ids, supabase=object()))
+    assert http.batch_calls == 1
+    assert sorted(e["id"] for e in events) == ["p1", "p2", "p3", "w1"]
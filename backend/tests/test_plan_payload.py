@@ -0,0 +1,28 @@
+"""Free-block encoding for the compact /api/plan prompt.
+
+Run from backend/:  python -m pytest tests
+"""
+from datetime import datetime, timezone
+
+from api.plan_payload import encode_free_blocks
+
+BASE = datetime(2024, 1, 1, 9, 0, tzinfo=timezone.utc)
+
+
+def _block(start: str, end: str) -> dict:
+    return {"start": f"2024-01-01T{start}:00+00:00", "end": f"2024-01-01T{end}:00+00:00"}
+
+
+def test_blocks_closer_than_merge_gap_are_joined():
+    blocks = [_block("09:00", "10:00"), _block("10:05", "11:00"), _block("11:30", "12:00")]
+    assert encode_free_blocks(blocks, BASE, 15, merge_gap_minutes=10) == [[0, 120], [150, 180]]
+
+
+def test_without_merge_gap_only_touching_blocks_are_joined():
+    blocks = [_block("09:00", "10:00"), _block("10:00", "10:30"), _block("10:35", "11:00")]
+    assert encode_free_blocks(blocks, BASE, 15) == [[0, 90], [95, 120]]
+
+
+def test_short_blocks_are_dropped_after_merging():
+    blocks = [_block("09:00", "09:10"), _block("09:15", "09:25"), _block("13:00", "13:05")]
+    assert encode_free_blocks(blocks, BASE, 15, merge_gap_minutes=10) == [[0, 25]]
@@ -35,12 +35,15 @@ const API = 'https://skedule.onrender.com';
       return session?.access_token || '';
     }
 
+    // Last GET response per path; revalidated with If-None-Match
+    const etagCache = new Map();
+
     async function api(path, opts = {}) {
       const url = `${API}${path}`;
       const headers = { ...opts.headers, 'Content-Type': 'application/json' };
       if (getToken()) headers['Authorization'] = `Bearer ${getToken()}`;
       const res = await fetch(url, { ...opts, headers });
-      if (!res.ok) {
+      if (!res.ok && res.status !== 304) {
         const text = await res.text();
         const err = new Error(text || res.statusText);
         err.status = res.status;
@@ -49,6 +52,30 @@ const API = 'https://skedule.onrender.com';
       return opts.raw ? res : res.json();
     }
 
+    // GET that sends the cached ETag and reuses the cached body on 304
+    async function apiGet(path) {
+      const cached = etagCache.get(path);
+      const res = await api(path, { raw: true, headers: cached ? { 'If-None-Match': cached.etag } : {} });
+      if (res.status === 304 && cached) return cached;
+      const entry = { etag: res.headers.get('ETag'), body: await res.json(), next: res.headers.get('X-Next-Cursor') };
+      if (entry.etag) etagCache.set(path, entry);
+      else etagCache.delete(path);
+      return entry;
+    }
+
+    // Follow X-Next-Cursor through every page of a list endpoint
+    async function apiAll(path) {
+      const items = [];
+      let cursor = null;
+      do {
+        const sep = path.includes('?') ? '&' : '?';
+        const page = await apiGet(cursor ? `${path}${sep}cursor=${encodeURIComponent(cursor)}` : path);
+        items.push(...page.body);
+        cursor = page.next;
+      } while (cursor);
+      return items;
+    }
+
     function setupProfileForm() {
       const form = document.getElementById('profile-form');
       if (!form) return;
@@ -777,7 +804,7 @@ const API = 'https://skedule.onrender.com';
         return;
       }
       try {
-        const res = await api(`/api/calendar/week?start=${start.toISOString()}&end=${end.toISOString()}`);
+        const res = (await apiGet(`/api/calendar/week?start=${start.toISOString()}&end=${end.toISOString()}`)).body;
         calendarEvents = Array.isArray(res) ? res : (res.events || []);
         calendarBusy = res.busy || [];
         calendarFree = res.free || [];
@@ -802,7 +829,7 @@ const API = 'https://skedule.onrender.com';
 
     async function loadProfile() {
       if (!getToken()) return;
-      const profile = await api('/api/profile');
+      const profile = (await apiGet('/api/profile')).body;
       const nameInput = document.querySelector('[name="display_name"]');
       if (nameInput) nameInput.value = profile.display_name || '';
       setCalendarConnected(profile.calendar_connected);
@@ -831,6 +858,7 @@ const API = 'https://skedule.onrender.com';
       renderAuth();
       sb.auth.onAuthStateChange((e, s) => {
         session = s;
+        etagCache.clear();
         if (session) {
           showMain();
           loadProfile();
@@ -880,7 +908,7 @@ const API = 'https://skedule.onrender.com';
 
     async function loadTasks() {
       if (!getToken()) return;
-      const tasks = await api('/api/tasks');
+      const tasks = await apiAll('/api/tasks');
       tasksCache = tasks || [];
       tasksById.clear();
       tasksCache.forEach(t => { if (t && t.id) tasksById.set(t.id, t); });
@@ -1057,13 +1085,14 @@ const API = 'https://skedule.onrender.com';
         if (lastAttempt && (Date.now() - lastAttempt) < LLM_ESTIMATE_TTL_MS) return;
         llmEstimateInFlight.add(taskId);
         const taskText = [task?.name, task?.description].filter(Boolean).join(' - ') || 'Task';
-        await api('/api/llm', {
+        await api('/api/plan', {
           method: 'POST',
           body: JSON.stringify({
             task_id: taskId,
             task: taskText,
             start: start.toISOString(),
             end: end.toISOString(),
+            estimate_only: true,
           }),
         });
       } catch (e) {
@@ -1109,7 +1138,7 @@ const API = 'https://skedule.onrender.com';
       } else if (!showExplain) {
         renderSuggestionsExplain([], { reset: true });
       }
-      const list = await api('/api/suggestions');
+      const list = await apiAll('/api/suggestions');
       const items = Array.isArray(list?.items) ? list.items : (Array.isArray(list) ? list : []);
       suggestionsCache = items;
       const pending = items.filter(s => s.status === 'pending');
@@ -0,0 +1,22 @@
+-- Replace a task's pending suggestions with a new set in one transaction
+create or replace function public.replace_pending_suggestions(
+  p_user_id uuid,
+  p_task_id uuid,
+  p_slots jsonb
+)
+returns setof public.suggested_slots
+language plpgsql
+as $$
+begin
+  delete from public.suggested_slots
+  where user_id = p_user_id
+    and task_id = p_task_id
+    and status = 'pending';
+
+  return query
+  insert into public.suggested_slots (task_id, user_id, start_time, end_time, status)
+  select p_task_id, p_user_id, (s->>'start_time')::timestamptz, (s->>'end_time')::timestamptz, 'pending'
+  from jsonb_array_elements(coalesce(p_slots, '[]'::jsonb)) as s
+  returning *;
+end;
+$$;
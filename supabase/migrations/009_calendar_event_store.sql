@@ -0,0 +1,39 @@
+-- calendar_sync_state: per-calendar Google sync token for incremental event sync
+create table if not exists public.calendar_sync_state (
+  user_id uuid not null references auth.users(id) on delete cascade,
+  calendar_id text not null,
+  sync_token text,
+  window_start timestamptz not null,
+  synced_at timestamptz not null default now(),
+  primary key (user_id, calendar_id)
+);
+
+-- calendar_events: normalized local copy of synced Google Calendar events
+create table if not exists public.calendar_events (
+  user_id uuid not null references auth.users(id) on delete cascade,
+  calendar_id text not null,
+  event_id text not null,
+  summary text,
+  -- raw Google values: dateTime for timed events, date for all-day events
+  start_value text not null,
+  end_value text not null,
+  start_at timestamptz not null,
+  end_at timestamptz not null,
+  all_day boolean not null default false,
+  -- counts toward free/busy (opaque and not declined)
+  busy boolean not null default true,
+  updated_at timestamptz not null default now(),
+  primary key (user_id, calendar_id, event_id)
+);
+
+create index if not exists calendar_events_user_range
+  on public.calendar_events (user_id, start_at, end_at);
+
+alter table public.calendar_sync_state enable row level security;
+alter table public.calendar_events enable row level security;
+
+create policy "Users can manage own calendar_sync_state"
+  on public.calendar_sync_state for all using (auth.uid() = user_id);
+
+create policy "Users can manage own calendar_events"
+  on public.calendar_events for all using (auth.uid() = user_id);
@@ -0,0 +1,17 @@
+-- calendar_day_cache: events/busy per user and UTC day; ranges are assembled from days
+create table if not exists public.calendar_day_cache (
+  user_id uuid not null references auth.users(id) on delete cascade,
+  day date not null,
+  events jsonb not null default '[]'::jsonb,
+  busy jsonb not null default '[]'::jsonb,
+  fetched_at timestamptz not null default now(),
+  primary key (user_id, day)
+);
+
+alter table public.calendar_day_cache enable row level security;
+
+create policy "Users can manage own calendar_day_cache"
+  on public.calendar_day_cache for all using (auth.uid() = user_id);
+
+-- Superseded by calendar_day_cache
+drop table if exists public.calendar_week_cache;
@@ -0,0 +1,13 @@
+-- plan_cache: Gemini plan responses keyed by a hash of model + prompt payload
+create table if not exists public.plan_cache (
+  user_id uuid not null references auth.users(id) on delete cascade,
+  cache_key text not null,
+  plan jsonb not null,
+  created_at timestamptz not null default now(),
+  primary key (user_id, cache_key)
+);
+
+alter table public.plan_cache enable row level security;
+
+create policy "Users can manage own plan_cache"
+  on public.plan_cache for all using (auth.uid() = user_id);
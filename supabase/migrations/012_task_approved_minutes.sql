@@ -0,0 +1,48 @@
+-- tasks.approved_minutes: total minutes of approved suggestions, maintained by trigger
+alter table public.tasks
+  add column if not exists approved_minutes integer not null default 0;
+
+create or replace function public.slot_minutes(p_start timestamptz, p_end timestamptz)
+returns integer
+language sql
+immutable
+as $$
+  select greatest(0, round(extract(epoch from (p_end - p_start)) / 60.0))::integer;
+$$;
+
+create or replace function public.sync_task_approved_minutes()
+returns trigger
+language plpgsql
+as $$
+begin
+  if tg_op in ('UPDATE', 'DELETE') and old.status = 'approved' then
+    update public.tasks
+    set approved_minutes = greatest(0, approved_minutes - public.slot_minutes(old.start_time, old.end_time))
+    where id = old.task_id;
+  end if;
+  if tg_op in ('INSERT', 'UPDATE') and new.status = 'approved' then
+    update public.tasks
+    set approved_minutes = approved_minutes + public.slot_minutes(new.start_time, new.end_time)
+    where id = new.task_id;
+  end if;
+  return null;
+end;
+$$;
+
+drop trigger if exists suggested_slots_approved_minutes on public.suggested_slots;
+create trigger suggested_slots_approved_minutes
+  after insert or delete or update of status, start_time, end_time, task_id
+  on public.suggested_slots
+  for each row execute function public.sync_task_approved_minutes();
+
+-- Backfill from existing approvals
+update public.tasks t
+set approved_minutes = coalesce(
+  (
+    select sum(public.slot_minutes(s.start_time, s.end_time))
+    from public.suggested_slots s
+    where s.task_id = t.id
+      and s.status = 'approved'
+  ),
+  0
+);
@@ -0,0 +1,7 @@
+-- Keyset pagination for /api/tasks and /api/suggestions: (sort column, id) per user
+drop index if exists public.tasks_user_created_at;
+create index if not exists tasks_user_created_at_id
+  on public.tasks (user_id, created_at desc, id desc);
+
+create index if not exists suggested_slots_user_start_id
+  on public.suggested_slots (user_id, start_time, id);
@@ -0,0 +1,31 @@
+-- updated_at on tasks and suggested_slots: with the row count, the version behind list ETags
+alter table public.tasks
+  add column if not exists updated_at timestamptz not null default now();
+alter table public.suggested_slots
+  add column if not exists updated_at timestamptz not null default now();
+
+create or replace function public.touch_updated_at()
+returns trigger
+language plpgsql
+as $$
+begin
+  new.updated_at = now();
+  return new;
+end;
+$$;
+
+drop trigger if exists tasks_touch_updated_at on public.tasks;
+create trigger tasks_touch_updated_at
+  before update on public.tasks
+  for each row execute function public.touch_updated_at();
+
+drop trigger if exists suggested_slots_touch_updated_at on public.suggested_slots;
+create trigger suggested_slots_touch_updated_at
+  before update on public.suggested_slots
+  for each row execute function public.touch_updated_at();
+
+-- Version reads: newest updated_at and count of one user's rows
+create index if not exists tasks_user_updated_at
+  on public.tasks (user_id, updated_at desc);
+create index if not exists suggested_slots_user_updated_at
+  on public.suggested_slots (user_id, updated_at desc);
@@ -0,0 +1,19 @@
+-- Write back a batch of refreshed tokens in one statement. Updates only: a
+-- row deleted by a disconnect is not re-created.
+create or replace function public.update_calendar_tokens(p_rows jsonb)
+returns integer
+language sql
+as $$
+  with updated as (
+    update public.calendar_tokens t
+    set access_token = r.access_token,
+        refresh_token = r.refresh_token,
+        token_expiry = r.token_expiry,
+        updated_at = r.updated_at
+    from jsonb_to_recordset(coalesce(p_rows, '[]'::jsonb))
+      as r(user_id uuid, access_token text, refresh_token text, token_expiry timestamptz, updated_at timestamptz)
+    where t.user_id = r.user_id
+    returning 1
+  )
+  select count(*)::integer from updated;
+$$;